@@ -1,299 +1,1002 @@
-import sys
-import json
-import random
-import string
-import os
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QWidget, QTextEdit, QListWidget, QDialog, QLineEdit, QAction, QMenu, QMessageBox, QColorDialog, QFontDialog, QFileDialog, QTextBrowser, QInputDialog, QCheckBox, QSlider, QComboBox
-from PyQt5.QtCore import Qt
-
-class Note:
-    def __init__(self, title, content, locked=False):
-        self.title = title
-        self.content = content
-        self.locked = locked
-
-class NoteList:
-    def __init__(self):
-        self.notes = []
-
-    def add_note(self, note):
-        self.notes.append(note)
-
-    def remove_note(self, index):
-        del self.notes[index]
-
-    def save_notes(self, filename):
-        data = {"notes": [{"title": note.title, "content": note.content, "locked": note.locked} for note in self.notes]}
-        with open(filename, 'w') as f:
-            json.dump(data, f)
-
-    def load_notes(self, filename):
-        with open(filename, 'r') as f:
-            data = json.load(f)
-            self.notes = [Note(note['title'], note['content'], note.get('locked', False)) for note in data['notes']]
-
-class AddNoteDialog(QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Add Note")
-        layout = QVBoxLayout()
-        self.title_label = QLabel("Title:")
-        layout.addWidget(self.title_label)
-        self.title_edit = QLineEdit()
-        layout.addWidget(self.title_edit)
-        self.content_label = QLabel("Content:")
-        layout.addWidget(self.content_label)
-        self.content_edit = QTextEdit()
-        layout.addWidget(self.content_edit)
-        self.save_button = QPushButton("Save")
-        self.save_button.clicked.connect(self.accept)
-        layout.addWidget(self.save_button)
-        self.setLayout(layout)
-
-    def get_note_info(self):
-        return self.title_edit.text(), self.content_edit.toPlainText()
-
-class ViewNoteDialog(QDialog):
-    def __init__(self, title, content, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle(title)
-        layout = QVBoxLayout()
-
-        self.title_label = QLabel("Title:")
-        layout.addWidget(self.title_label)
-        self.title_label = QLabel(title)
-        layout.addWidget(self.title_label)
-
-        self.content_label = QLabel("Content:")
-        layout.addWidget(self.content_label)
-        self.content_edit = QTextEdit()
-        self.content_edit.setPlainText(content)
-        self.content_edit.setReadOnly(True)
-        layout.addWidget(self.content_edit)
-
-        self.setLayout(layout)
-
-class NoteApp(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("ProdP - Your Production++ Notepad")
-        self.note_list = NoteList()
-        self.note_list.load_notes('notes.json')
-        self.settings = self.load_settings()
-        self.create_widgets()
-        self.set_dark_mode()
-
-    def load_settings(self):
-        try:
-            with open('settings.json', 'r') as f:
-                settings_data = json.load(f)
-            return settings_data
-        except FileNotFoundError:
-            return {}
-
-    def create_widgets(self):
-        self.central_widget = QWidget()
-        self.setCentralWidget(self.central_widget)
-
-        self.layout = QVBoxLayout()
-
-        self.title_label = QLabel("ProdP - Your Production++ Notepad")
-        self.layout.addWidget(self.title_label)
-
-        self.note_listbox = QListWidget()
-        self.note_listbox.itemDoubleClicked.connect(self.show_note_content)
-        self.note_listbox.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.note_listbox.customContextMenuRequested.connect(self.show_context_menu)
-        self.update_note_listbox()
-        self.layout.addWidget(self.note_listbox)
-
-        self.add_note_button = QPushButton("Add Note")
-        self.add_note_button.clicked.connect(self.add_note)
-        self.layout.addWidget(self.add_note_button)
-
-        self.help_button = QPushButton("Help")
-        self.help_button.clicked.connect(self.show_help)
-        self.layout.addWidget(self.help_button)
-
-        self.dev_mode_button = QPushButton("Developer Mode")
-        self.dev_mode_button.clicked.connect(self.show_developer_mode)
-        self.layout.addWidget(self.dev_mode_button)
-
-        self.import_txt_button = QPushButton("Import .txt")
-        self.import_txt_button.clicked.connect(self.import_txt)
-        self.layout.addWidget(self.import_txt_button)
-
-        self.open_calculator_button = QPushButton("Calculator")
-        self.open_calculator_button.clicked.connect(self.open_calculator)
-        self.layout.addWidget(self.open_calculator_button)
-
-        self.central_widget.setLayout(self.layout)
-
-    def add_note(self):
-        dialog = AddNoteDialog(self)
-        if dialog.exec_():
-            title, content = dialog.get_note_info()
-            if title and content:
-                self.note_list.add_note(Note(title, content))
-                self.update_note_listbox()
-                self.note_list.save_notes('notes.json')
-
-    def show_context_menu(self, pos):
-        index = self.note_listbox.indexAt(pos)
-        if index.isValid():
-            context_menu = QMenu(self)
-            view_action = QAction("View Note", self)
-            view_action.triggered.connect(lambda: self.view_note(index))
-            context_menu.addAction(view_action)
-            note = self.note_list.notes[index.row()]
-            if not note.locked:
-                edit_action = QAction("Edit Note", self)
-                edit_action.triggered.connect(lambda: self.edit_note(index))
-                delete_action = QAction("Delete Note", self)
-                delete_action.triggered.connect(lambda: self.delete_note(index))
-                lock_action = QAction("Lock Note", self)
-                lock_action.triggered.connect(lambda: self.lock_note(index))
-                context_menu.addAction(edit_action)
-                context_menu.addAction(delete_action)
-                context_menu.addAction(lock_action)
-            else:
-                unlock_action = QAction("Unlock Note", self)
-                unlock_action.triggered.connect(lambda: self.unlock_note(index))
-                context_menu.addAction(unlock_action)
-            save_as_txt_action = QAction("Save as .txt", self)
-            save_as_txt_action.triggered.connect(lambda: self.save_as_txt(index))
-            context_menu.addAction(save_as_txt_action)
-            context_menu.exec_(self.note_listbox.mapToGlobal(pos))
-
-    def view_note(self, index):
-        note = self.note_list.notes[index.row()]
-        if note.locked:
-            random_string = ''.join(random.choices(string.ascii_letters + string.digits, k=20))
-            user_input, ok = QInputDialog.getText(self, "Unlock Note", f"Enter the 20 character string to unlock the note:\n{random_string}")
-            if ok:
-                if user_input == random_string:
-                    dialog = ViewNoteDialog(note.title, note.content, self)
-                    dialog.exec_()
-                else:
-                    QMessageBox.warning(self, "Incorrect String", "The string you entered is incorrect. Please try again.")
-        else:
-            dialog = ViewNoteDialog(note.title, note.content, self)
-            dialog.exec_()
-
-    def lock_note(self, index):
-        note = self.note_list.notes[index.row()]
-        if self.confirm_action("Confirm Lock", "Are you sure you want to lock this note?"):
-            note.locked = True
-            self.update_note_listbox()
-            self.note_list.save_notes('notes.json')
-
-    def unlock_note(self, index):
-        note = self.note_list.notes[index.row()]
-        if note.locked:
-            random_string = ''.join(random.choices(string.ascii_letters + string.digits, k=20))
-            user_input, ok = QInputDialog.getText(self, "Unlock Note", f"Enter the 20 character string to unlock the note:\n{random_string}")
-            if ok:
-                if user_input == random_string:
-                    note.locked = False
-                    self.update_note_listbox()
-                    self.note_list.save_notes('notes.json')
-                else:
-                    QMessageBox.warning(self, "Incorrect String", "The string you entered is incorrect. Please try again.")
-        else:
-            QMessageBox.warning(self, "Note Unlocked", "This note is already unlocked.")
-
-        def save_as_txt(self, index):
-            note = self.note_list.notes[index.row()]
-            filename, _ = QFileDialog.getSaveFileName(self, "Save as .txt", f"{note.title}.txt", "Text Files (*.txt)")
-            if filename:
-                with open(filename, 'w') as f:
-                    f.write(note.content)
-
-    def set_dark_mode(self):
-        self.setStyleSheet("background: qlineargradient(x1:0, y1:0, x2:1, y2:1,stop:0 #2c2c2c, stop:1 black); color: yellow;")
-
-
-    def show_help(self):
-        message = QMessageBox()
-        message.setWindowTitle("Help")
-        message.setText("ProdP - Your Production++ Notepad\n\nFeatures:\n\n- Add Note: Click this button to add a new note.\n\n- Right Clicks - Select a note then right-click it to View Edit, Delete, Save as, Lock, or Unlock it.\n\n- Developer Mode: Open the Python executor/terminal (ExecutePy.py).\n\n- Import .txt: Import a .txt file into Notelist.\n\n- Calculator: Open a calculator. What did you expect?\n\n- Ignore: if you view a file named ignore you can't view it, though you can still do the rest of the options.\n\n- Help: Click this button to display this help message.")
-        message.setStyleSheet("background-color: black; color: yellow;")
-        message.exec_()
-
-    def confirm_action(self, title, message):
-        confirm_dialog = QMessageBox()
-        confirm_dialog.setWindowTitle(title)
-        confirm_dialog.setText(message)
-        confirm_dialog.setIcon(QMessageBox.Question)
-        confirm_dialog.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-        confirm_dialog.setDefaultButton(QMessageBox.No)
-        return confirm_dialog.exec_() == QMessageBox.Yes
-    
-    def show_note_content(self, item):
-        index = self.note_listbox.row(item)
-        note = self.note_list.notes[index]
-        dialog = ViewNoteDialog(note.title, note.content, self)
-        dialog.exec_()
-
-    def update_note_listbox(self):
-        self.note_listbox.clear()
-        for note in self.note_list.notes:
-            self.note_listbox.addItem(note.title)
-
-    def delete_note(self, index):
-        if self.settings.get('disable_confirmation', False) or self.confirm_action("Confirm Delete", "Are you sure you want to delete this note?"):
-            self.note_list.remove_note(index.row())
-            self.update_note_listbox()
-            self.note_list.save_notes('notes.json')
-
-    def save_as_txt(self, index):
-        note = self.note_list.notes[index.row()]
-        filename, _ = QFileDialog.getSaveFileName(self, "Save as .txt", f"{note.title}.txt", "Text Files (*.txt)")
-        if filename:
-            with open(filename, 'w') as f:
-                f.write(note.content)
-
-    def view_note(self, index):
-        note = self.note_list.notes[index.row()]
-        if note.title == "ignore":
-            pass
-        else:
-            dialog = ViewNoteDialog(note.title, note.content, self)
-            dialog.exec_()
-
-    def show_developer_mode(self):
-        os.system("python ExecutePy.py")
-
-    def open_calculator(self):
-        os.system("python calculator.py")
-
-    def import_txt(self):
-        filename, _ = QFileDialog.getOpenFileName(self, "Import .txt", filter="Text Files (*.txt)")
-        if filename:
-            with open(filename, 'r') as f:
-                content = f.read()
-            title, ok = QInputDialog.getText(self, "Enter Note Title", "Enter a title for the note:")
-            if ok:
-                self.note_list.add_note(Note(title, content))
-                self.update_note_listbox()
-                self.note_list.save_notes('notes.json')
-    def edit_note(self, index):
-        note = self.note_list.notes[index.row()]
-        dialog = AddNoteDialog(self)
-        dialog.setWindowTitle("Edit Note")
-        dialog.title_edit.setText(note.title)
-        dialog.content_edit.setPlainText(note.content)
-
-        if dialog.exec_():
-            title, content = dialog.get_note_info()
-            if title and content:
-                note.title = title
-                note.content = content
-                self.update_note_listbox()
-                self.note_list.save_notes('notes.json')
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = NoteApp()
-    window.show()
+import sys
+import json
+import random
+import string
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from noteList import Note, NoteList, JsonBackend, NotebookChanged, NotebookInUse, PackedContent, JOURNAL_COMPACT_BYTES
+from noteSearch import TrigramIndex
+from bulkImport import BulkImport, find_files
+from bulkExport import BulkExport
+from toolHost import ToolHost
+from perfStats import metrics, start_timer, timed
+from diagnosticsWindow import DiagnosticsWindow, StallMonitor
+from pagedView import BytesSource, PagedTextViewer
+from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QTextEdit, QListView, QListWidget, QDialog, QLineEdit, QAction, QMenu, QMessageBox, QColorDialog, QFontDialog, QFileDialog, QTextBrowser, QInputDialog, QCheckBox, QSlider, QComboBox, QProgressDialog
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+SAVE_DELAY_MS = 500
+MERGE_DELAY_MS = 200
+FILTER_DELAY_MS = 150
+FILTER_PAGE_ROWS = 500
+LARGE_NOTE_BYTES = 1024 * 1024
+
+def large_note_source(note):
+    # A BytesSource for a note too large for the QTextEdit dialogs, or None. Bodies still in a
+    # .pack file are measured and copied as bytes without decoding them.
+    content = note._content
+    if isinstance(content, PackedContent):
+        return BytesSource(content.read_bytes()) if content.length >= LARGE_NOTE_BYTES else None
+    if not isinstance(content, str):
+        content = content.read()
+    if len(content) < LARGE_NOTE_BYTES:
+        return None
+    return BytesSource(content.encode('utf-8'))
+
+class SaveScheduler(QObject):
+    # Coalesces bursts of changes into one save, written on a worker thread.
+    state_changed = pyqtSignal(str)
+    write_done = pyqtSignal(object)
+    notebook_changed = pyqtSignal()
+
+    def __init__(self, note_list, filename, delay=SAVE_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.note_list = note_list
+        self.filename = filename
+        self.state = 'saved'
+        self.error = None
+        self.dirty = False
+        self.save = None
+        self.save_timer = None
+        self.future = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.start_save)
+        self.write_done.connect(self.finish_save)
+
+    def set_state(self, state):
+        if state != self.state or state == 'error':
+            self.state = state
+            self.state_changed.emit(state)
+
+    def schedule(self):
+        self.dirty = True
+        if self.future is None:
+            self.set_state('pending')
+        self.timer.start()
+
+    def start_save(self):
+        if self.future is not None:
+            return
+        self.dirty = False
+        self.save_timer = start_timer('save_notes.background')
+        self.save = self.note_list.prepare_save(self.filename)
+        self.set_state('saving')
+        self.future = self.executor.submit(self.save.write)
+        self.future.add_done_callback(self.write_done.emit)
+
+    def finish_save(self, future):
+        if future is not self.future:
+            return
+        self.future = None
+        self.error = future.exception()
+        if isinstance(self.error, NotebookChanged):
+            # Nothing was written. The app merges what the other process saved, then saves again.
+            self.error = None
+            self.save = None
+            self.dirty = True
+            self.set_state('pending')
+            self.notebook_changed.emit()
+            return
+        if self.error is None:
+            self.save.finish()
+            if self.save_timer is not None:
+                self.save_timer.stop()
+        else:
+            self.dirty = True
+        self.save = None
+        if self.error is not None:
+            self.set_state('error')
+        elif self.dirty:
+            self.set_state('pending')
+            self.timer.start()
+        else:
+            self.set_state('saved')
+
+    def wait(self):
+        if self.future is not None:
+            self.future.exception()
+            self.finish_save(self.future)
+
+    def flush(self):
+        self.timer.stop()
+        self.wait()
+        if self.dirty:
+            # Left dirty if the save raises, so the caller can retry or give up on it.
+            self.note_list.save_notes(self.filename)
+            self.dirty = False
+            self.set_state('saved')
+
+    def close(self):
+        self.flush()
+        self.executor.shutdown()
+
+class BackgroundTask(QObject):
+    # Runs func(progress) on a plain thread and reports back to the GUI thread through signals.
+    progress = pyqtSignal(int, int)
+    done = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+    def __init__(self, func, parent=None):
+        super().__init__(parent)
+        self.func = func
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        try:
+            result = self.func(self.progress.emit)
+        except Exception as error:
+            self.failed.emit(error)
+        else:
+            self.done.emit(result)
+
+class NoteListModel(QAbstractListModel):
+    # Wraps the NoteList mutations so the view is told about the single row that changed.
+    # With a filter set, rows are the filter's results and are mapped back to the NoteList. They are
+    # shown FILTER_PAGE_ROWS at a time, the view fetching the next page as it scrolls to the end.
+    # Each kind of change is timed as a list_update metric.
+    def __init__(self, note_list, parent=None):
+        super().__init__(parent)
+        self.note_list = note_list
+        self.filter = None
+        self.rows = None
+        self.shown = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self.rows is not None:
+            return min(self.shown, len(self.rows))
+        return len(self.note_list.notes)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.rows is not None and self.shown < len(self.rows)
+
+    @timed('list_update.fetch_more')
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(FILTER_PAGE_ROWS, len(self.rows) - self.shown)
+        self.beginInsertRows(QModelIndex(), self.shown, self.shown + count - 1)
+        self.shown += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.note_at(index).title
+        return None
+
+    def note_at(self, index):
+        if self.rows is not None:
+            return self.rows[index.row()]
+        return self.note_list.notes[index.row()]
+
+    def note_row(self, row):
+        if self.rows is not None:
+            return self.note_list.notes.index(self.rows[row])
+        return row
+
+    @timed('list_update.filter')
+    def set_filter(self, filter=None):
+        self.beginResetModel()
+        self.filter = filter
+        self.rows = filter() if filter else None
+        self.shown = FILTER_PAGE_ROWS
+        self.endResetModel()
+
+    @timed('list_update.add')
+    def add_note(self, note):
+        if self.rows is not None:
+            self.note_list.add_note(note)
+            self.set_filter(self.filter)
+            return
+        row = len(self.note_list.notes)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.note_list.add_note(note)
+        self.endInsertRows()
+
+    @timed('list_update.add')
+    def add_notes(self, notes):
+        if self.rows is not None:
+            self.note_list.add_notes(notes)
+            self.set_filter(self.filter)
+            return
+        row = len(self.note_list.notes)
+        self.beginInsertRows(QModelIndex(), row, row + len(notes) - 1)
+        self.note_list.add_notes(notes)
+        self.endInsertRows()
+
+    @timed('list_update.remove')
+    def remove_note(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.note_list.remove_note(self.note_row(row))
+        if self.rows is not None:
+            del self.rows[row]
+            self.shown -= 1
+        self.endRemoveRows()
+
+    @timed('list_update.edit')
+    def edit_note(self, row, title, content):
+        self.note_list.edit_note(self.note_row(row), title, content)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    @timed('list_update.edit')
+    def set_locked(self, row, locked):
+        self.note_list.set_locked(self.note_row(row), locked)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    @timed('list_update.merge')
+    def merge(self, merge):
+        # Applies a NotebookMerge. Without a filter only the changed rows are updated, removed
+        # or inserted; with one the filter is run again once, as add_note does.
+        filtered = self.rows is not None
+        for index, title, content, locked in merge.updates:
+            note = self.note_list.notes[index]
+            if title != note.title or content != note.content:
+                self.note_list.edit_note(index, title, content)
+            if locked != note.locked:
+                self.note_list.set_locked(index, locked)
+            if not filtered:
+                self.dataChanged.emit(self.index(index), self.index(index))
+        for index in merge.removes:
+            if not filtered:
+                self.beginRemoveRows(QModelIndex(), index, index)
+            self.note_list.remove_note(index)
+            if not filtered:
+                self.endRemoveRows()
+        if filtered:
+            if merge.adds:
+                self.note_list.add_notes(merge.adds)
+            self.set_filter(self.filter)
+        elif merge.adds:
+            self.add_notes(merge.adds)
+
+class AddNoteDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Add Note")
+        layout = QVBoxLayout()
+        self.title_label = QLabel("Title:")
+        layout.addWidget(self.title_label)
+        self.title_edit = QLineEdit()
+        layout.addWidget(self.title_edit)
+        self.content_label = QLabel("Content:")
+        layout.addWidget(self.content_label)
+        self.content_edit = QTextEdit()
+        layout.addWidget(self.content_edit)
+        self.save_button = QPushButton("Save")
+        self.save_button.clicked.connect(self.accept)
+        layout.addWidget(self.save_button)
+        self.setLayout(layout)
+
+    def get_note_info(self):
+        return self.title_edit.text(), self.content_edit.toPlainText()
+
+class ViewNoteDialog(QDialog):
+    def __init__(self, title, content, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        layout = QVBoxLayout()
+
+        self.title_label = QLabel("Title:")
+        layout.addWidget(self.title_label)
+        self.title_label = QLabel(title)
+        layout.addWidget(self.title_label)
+
+        self.content_label = QLabel("Content:")
+        layout.addWidget(self.content_label)
+        self.content_edit = QTextEdit()
+        self.content_edit.setPlainText(content)
+        self.content_edit.setReadOnly(True)
+        layout.addWidget(self.content_edit)
+
+        self.setLayout(layout)
+
+class LargeNoteDialog(QDialog):
+    # Views or edits a note of several megabytes. Only a window of it is in the editor at a time,
+    # and Find searches the note's bytes instead of the editor's text.
+    def __init__(self, title, source, editable=False, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        layout = QVBoxLayout()
+        self.title_label = QLabel("Title:")
+        layout.addWidget(self.title_label)
+        self.title_edit = QLineEdit(title)
+        self.title_edit.setReadOnly(not editable)
+        layout.addWidget(self.title_edit)
+
+        find_layout = QHBoxLayout()
+        self.find_edit = QLineEdit()
+        self.find_edit.setPlaceholderText("Find in note")
+        self.find_edit.returnPressed.connect(self.find_next)
+        find_layout.addWidget(self.find_edit)
+        self.find_previous_button = QPushButton("Previous")
+        self.find_previous_button.setAutoDefault(False)
+        self.find_previous_button.clicked.connect(self.find_previous)
+        find_layout.addWidget(self.find_previous_button)
+        self.find_next_button = QPushButton("Next")
+        self.find_next_button.setAutoDefault(False)
+        self.find_next_button.clicked.connect(self.find_next)
+        find_layout.addWidget(self.find_next_button)
+        self.find_status = QLabel()
+        find_layout.addWidget(self.find_status)
+        layout.addLayout(find_layout)
+
+        self.viewer = PagedTextViewer(source, editable=editable)
+        layout.addWidget(self.viewer)
+        if editable:
+            self.save_button = QPushButton("Save")
+            self.save_button.setAutoDefault(False)
+            self.save_button.clicked.connect(self.accept)
+            layout.addWidget(self.save_button)
+        self.setLayout(layout)
+        self.resize(800, 600)
+
+    def find_next(self):
+        self.find_status.setText("" if self.viewer.find(self.find_edit.text()) else "Not found")
+
+    def find_previous(self):
+        self.find_status.setText("" if self.viewer.find(self.find_edit.text(), backward=True) else "Not found")
+
+    def get_note_info(self):
+        # The body is None when it was not edited, so an unchanged note is not written again.
+        return self.title_edit.text(), self.viewer.text() if self.viewer.modified else None
+
+class HistoryDialog(ViewNoteDialog):
+    # ViewNoteDialog with the note's earlier versions listed above it, newest first.
+    def __init__(self, history, note, parent=None):
+        super().__init__(note.title, note.content, parent)
+        self.setWindowTitle(f"History - {note.title}")
+        self.history = history
+        self.note = note
+        self.revisions = history.revisions(note.id)
+        self.selected = None
+        self.revision_list = QListWidget()
+        self.revision_list.addItem("Current version")
+        for revision in self.revisions:
+            self.revision_list.addItem(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(revision.time))}  {revision.title}")
+        self.revision_list.currentRowChanged.connect(self.show_revision)
+        self.layout().insertWidget(0, self.revision_list)
+        self.restore_button = QPushButton("Restore This Version")
+        self.restore_button.setEnabled(False)
+        self.restore_button.clicked.connect(self.accept)
+        self.layout().addWidget(self.restore_button)
+
+    def show_revision(self, row):
+        if row <= 0:
+            self.selected = None
+            self.title_label.setText(self.note.title)
+            self.content_edit.setPlainText(self.note.content)
+        else:
+            try:
+                self.selected = self.history.text(self.note.id, self.note.content, self.revisions[row - 1].rev)
+            except ValueError as e:
+                self.selected = None
+                self.title_label.setText("(unavailable)")
+                self.content_edit.setPlainText(str(e))
+            else:
+                self.title_label.setText(self.selected[0])
+                self.content_edit.setPlainText(self.selected[1])
+        self.restore_button.setEnabled(self.selected is not None)
+
+class QuickOpenDialog(QDialog):
+    def __init__(self, trigram_index, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Quick Open")
+        self.trigram_index = trigram_index
+        self.results = []
+        layout = QVBoxLayout()
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Note title")
+        self.query_edit.textChanged.connect(self.update_results)
+        self.query_edit.returnPressed.connect(self.accept)
+        layout.addWidget(self.query_edit)
+        self.result_list = QListWidget()
+        self.result_list.itemActivated.connect(self.accept)
+        layout.addWidget(self.result_list)
+        self.setLayout(layout)
+
+    def update_results(self, query):
+        self.results = self.trigram_index.search(query)
+        self.result_list.clear()
+        for note in self.results:
+            self.result_list.addItem(note.title)
+        if self.results:
+            self.result_list.setCurrentRow(0)
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Down, Qt.Key_Up):
+            self.result_list.keyPressEvent(event)
+        else:
+            super().keyPressEvent(event)
+
+    def selected_note(self):
+        row = self.result_list.currentRow()
+        if 0 <= row < len(self.results):
+            return self.results[row]
+        return None
+
+class NoteApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("ProdP - Your Production++ Notepad")
+        self.settings = self.load_settings()
+        self.stall_monitor = StallMonitor(self)
+        self.diagnostics_window = None
+        if self.settings.get('instrumentation', False):
+            metrics.enabled = True
+            self.stall_monitor.start()
+        self.notes_file = self.settings.get('notes_file', 'notes.json')
+        self.note_list = NoteList()
+        if not os.path.exists(self.notes_file) and os.path.exists('notes.json'):
+            # A new .pack or database notebook starts as a copy of notes.json.
+            self.note_list.load_notes('notes.json')
+            self.note_list.save_notes(self.notes_file)
+        self.note_list.load_notes(self.notes_file)
+        if 'compression' in self.settings:
+            self.note_list.backend.codec = self.settings['compression']
+        if self.settings.get('history', True):
+            self.note_list.open_history(self.notes_file, self.settings.get('history_max_revisions'))
+        if self.settings.get('journal', False) and type(self.note_list.backend) is JsonBackend:
+            try:
+                self.note_list.open_journal(self.notes_file, self.settings.get('journal_compact_bytes', JOURNAL_COMPACT_BYTES))
+            except NotebookInUse as error:
+                # Two writers would number and index their journal records differently.
+                QMessageBox.critical(None, "Notebook In Use", f"{error}. Close it there and start NoteApp again.")
+                sys.exit(1)
+        self.save_scheduler = SaveScheduler(self.note_list, self.notes_file, self.settings.get('save_delay_ms', SAVE_DELAY_MS), self)
+        self.save_scheduler.notebook_changed.connect(self.merge_notebook)
+        self.merging = False
+        self.merge_timer = QTimer(self)
+        self.merge_timer.setSingleShot(True)
+        self.merge_timer.setInterval(MERGE_DELAY_MS)
+        self.merge_timer.timeout.connect(self.merge_notebook)
+        self.notebook_watcher = None
+        if self.note_list.backend.merges and self.note_list.journal is None:
+            # Another NoteApp or a script may save the same notebook; their changes are merged in.
+            self.notebook_watcher = QFileSystemWatcher([self.notes_file], self)
+            self.notebook_watcher.fileChanged.connect(self.notebook_file_changed)
+        self.search_index = self.note_list.open_search_index()
+        self.note_list.add_listener(self.search_index)
+        self.trigram_index = TrigramIndex(self.note_list.notes)
+        self.note_list.add_listener(self.trigram_index)
+        self.tool_host = ToolHost(self.show_tool_timing)
+        self.create_widgets()
+        self.set_dark_mode()
+
+    def load_settings(self):
+        try:
+            with open('settings.json', 'r') as f:
+                settings_data = json.load(f)
+            return settings_data
+        except FileNotFoundError:
+            return {}
+
+    def save_notes(self):
+        if not self.note_list.writes_through():
+            self.save_scheduler.schedule()
+
+    def notebook_file_changed(self, path):
+        # Saves replace the file, which drops it from the watch list on some platforms.
+        if path not in self.notebook_watcher.files() and os.path.exists(path):
+            self.notebook_watcher.addPath(path)
+        self.merge_timer.start()
+
+    def merge_notebook(self):
+        backend = self.note_list.backend
+        if self.merging or self.notebook_watcher is None or not backend.changed_on_disk():
+            return
+        if self.save_scheduler.future is not None or QApplication.activeModalWidget() is not None:
+            # The change may be our own save, and an open dialog may be holding a row; look again later.
+            self.merge_timer.start()
+            return
+        self.merging = True
+        self.save_scheduler.timer.stop()
+        try:
+            merge = backend.merge(self.note_list)
+            for index, fields in merge.conflicts:
+                self.resolve_conflict(merge, index, fields)
+            self.note_model.merge(merge)
+        except (OSError, ValueError) as error:
+            self.statusBar().showMessage(f"Could not read changes to {self.notes_file}: {error}", 5000)
+            return
+        finally:
+            self.merging = False
+        if merge.conflicts or self.save_scheduler.dirty:
+            self.save_scheduler.schedule()
+        changed = len(merge.updates) + len(merge.removes) + len(merge.adds)
+        if changed:
+            self.statusBar().showMessage(f"Merged {changed} note(s) changed by another program", 5000)
+
+    def resolve_conflict(self, merge, index, fields):
+        # Turns one conflict into an update, remove or add on the merge, or leaves this side as is.
+        mine = self.note_list.notes[index] if index is not None else None
+        dialog = QMessageBox(self)
+        dialog.setWindowTitle("Note Conflict")
+        dialog.setIcon(QMessageBox.Warning)
+        if mine is not None and fields is not None:
+            dialog.setText(f'"{mine.title}" was changed here and by another program.')
+        elif fields is None:
+            dialog.setText(f'"{mine.title}" was changed here but deleted by another program.')
+        else:
+            dialog.setText(f'"{fields["title"]}" was deleted here but changed by another program.')
+        if fields is not None:
+            dialog.setDetailedText(f"{fields['title']}\n\n{fields['content']}")
+        keep_mine = dialog.addButton("Keep Mine", QMessageBox.RejectRole)
+        take_theirs = dialog.addButton("Take Theirs", QMessageBox.AcceptRole)
+        keep_both = None
+        if mine is not None and fields is not None:
+            keep_both = dialog.addButton("Keep Both", QMessageBox.AcceptRole)
+        dialog.setDefaultButton(keep_mine)
+        self.exec_dialog(dialog, start_timer('dialog.note_conflict'))
+        clicked = dialog.clickedButton()
+        if clicked is take_theirs:
+            if fields is None:
+                merge.removes.append(index)
+                merge.removes.sort(reverse=True)
+            elif mine is None:
+                merge.adds.append(Note.from_dict(fields))
+            else:
+                merge.updates.append((index, fields['title'], fields['content'], fields['locked']))
+        elif clicked is keep_both:
+            merge.adds.append(Note(f"{fields['title']} (other copy)", fields['content'], fields['locked']))
+
+    def show_save_state(self, state):
+        if self.note_list.journal is not None:
+            self.save_state_label.setText("Saved (journal)")
+        elif self.note_list.writes_through():
+            self.save_state_label.setText("Saved (database)")
+        elif state == 'pending':
+            self.save_state_label.setText("Unsaved changes")
+        elif state == 'saving':
+            self.save_state_label.setText("Saving...")
+        elif state == 'error':
+            self.save_state_label.setText(f"Save failed: {self.save_scheduler.error}")
+        else:
+            self.save_state_label.setText("Saved")
+
+    def show_diagnostics(self):
+        if self.diagnostics_window is None:
+            self.diagnostics_window = DiagnosticsWindow(self.stall_monitor)
+        self.diagnostics_window.show()
+        self.diagnostics_window.raise_()
+
+    def show_tool_timing(self, timing):
+        self.statusBar().showMessage(f"{timing['tool']} opened in {timing['total_ms']:.0f} ms "
+                                     f"(import {timing['import_ms']:.0f} ms, window {timing['create_ms']:.0f} ms)", 5000)
+        log_file = self.settings.get('tool_timing_log')
+        if log_file:
+            with open(log_file, 'a') as f:
+                f.write(json.dumps(timing) + '\n')
+
+    def save_before_close(self):
+        # The last save runs here, on the GUI thread. If it fails the window stays open unless
+        # the user chooses to throw the unsaved changes away.
+        self.save_scheduler.wait()
+        retried = False
+        while True:
+            self.merge_notebook()
+            try:
+                self.save_scheduler.flush()
+                return True
+            except NotebookChanged as error:
+                if not retried:
+                    # Another program saved since the merge above; merge that as well and try again.
+                    retried = True
+                    continue
+                failure = error
+            except OSError as error:
+                failure = error
+            answer = QMessageBox.warning(self, "Save Failed", f"Your latest changes could not be saved: {failure}",
+                                         QMessageBox.Retry | QMessageBox.Discard | QMessageBox.Cancel, QMessageBox.Retry)
+            if answer == QMessageBox.Discard:
+                self.save_scheduler.dirty = False
+                return True
+            if answer != QMessageBox.Retry:
+                # Keep trying in the background, where a failure shows in the status bar.
+                self.save_scheduler.schedule()
+                return False
+
+    def closeEvent(self, event):
+        if not self.save_before_close():
+            event.ignore()
+            return
+        if self.diagnostics_window is not None:
+            self.diagnostics_window.close()
+        self.tool_host.close()
+        self.save_scheduler.close()
+        self.search_index.save(self.notes_file + '.search', self.note_list)
+        self.note_list.close()
+        super().closeEvent(event)
+
+    def create_widgets(self):
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+
+        self.layout = QVBoxLayout()
+
+        self.title_label = QLabel("ProdP - Your Production++ Notepad")
+        self.layout.addWidget(self.title_label)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search notes")
+        # Filtering waits for a pause in typing instead of running on every keystroke.
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(lambda: self.filter_notes(self.search_edit.text()))
+        self.search_edit.textChanged.connect(lambda: self.filter_timer.start())
+        self.layout.addWidget(self.search_edit)
+
+        self.note_model = NoteListModel(self.note_list, self)
+        self.note_listbox = QListView()
+        self.note_listbox.setUniformItemSizes(True)
+        self.note_listbox.setLayoutMode(QListView.Batched)
+        self.note_listbox.setModel(self.note_model)
+        self.note_listbox.doubleClicked.connect(self.show_note_content)
+        self.note_listbox.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.note_listbox.customContextMenuRequested.connect(self.show_context_menu)
+        self.layout.addWidget(self.note_listbox)
+
+        self.add_note_button = QPushButton("Add Note")
+        self.add_note_button.clicked.connect(self.add_note)
+        self.layout.addWidget(self.add_note_button)
+
+        self.help_button = QPushButton("Help")
+        self.help_button.clicked.connect(self.show_help)
+        self.layout.addWidget(self.help_button)
+
+        self.quick_open_button = QPushButton("Quick Open")
+        self.quick_open_button.setShortcut("Ctrl+P")
+        self.quick_open_button.clicked.connect(self.quick_open)
+        self.layout.addWidget(self.quick_open_button)
+
+        self.dev_mode_button = QPushButton("Developer Mode")
+        self.dev_mode_button.clicked.connect(self.show_developer_mode)
+        self.layout.addWidget(self.dev_mode_button)
+
+        self.import_txt_button = QPushButton("Import .txt")
+        self.import_txt_button.clicked.connect(self.import_txt)
+        self.layout.addWidget(self.import_txt_button)
+
+        self.bulk_import_button = QPushButton("Bulk Import")
+        self.bulk_import_button.clicked.connect(self.bulk_import)
+        self.layout.addWidget(self.bulk_import_button)
+
+        self.bulk_export_button = QPushButton("Bulk Export")
+        self.bulk_export_button.clicked.connect(self.bulk_export)
+        self.layout.addWidget(self.bulk_export_button)
+
+        self.open_calculator_button = QPushButton("Calculator")
+        self.open_calculator_button.clicked.connect(self.open_calculator)
+        self.layout.addWidget(self.open_calculator_button)
+
+        self.central_widget.setLayout(self.layout)
+
+        # Not on a button: the diagnostics window is only reachable through its shortcut.
+        diagnostics_action = QAction("Diagnostics", self)
+        diagnostics_action.setShortcut("Ctrl+Shift+D")
+        diagnostics_action.triggered.connect(self.show_diagnostics)
+        self.addAction(diagnostics_action)
+
+        self.save_state_label = QLabel()
+        self.statusBar().addPermanentWidget(self.save_state_label)
+        self.save_scheduler.state_changed.connect(self.show_save_state)
+        self.show_save_state(self.save_scheduler.state)
+
+    def add_note(self):
+        timer = start_timer('dialog.add_note')
+        dialog = AddNoteDialog(self)
+        if self.exec_dialog(dialog, timer):
+            title, content = dialog.get_note_info()
+            if title and content:
+                self.note_model.add_note(Note(title, content))
+                self.save_notes()
+
+    def show_context_menu(self, pos):
+        index = self.note_listbox.indexAt(pos)
+        if index.isValid():
+            context_menu = QMenu(self)
+            view_action = QAction("View Note", self)
+            view_action.triggered.connect(lambda: self.view_note(index))
+            context_menu.addAction(view_action)
+            note = self.note_model.note_at(index)
+            if not note.locked:
+                edit_action = QAction("Edit Note", self)
+                edit_action.triggered.connect(lambda: self.edit_note(index))
+                delete_action = QAction("Delete Note", self)
+                delete_action.triggered.connect(lambda: self.delete_note(index))
+                lock_action = QAction("Lock Note", self)
+                lock_action.triggered.connect(lambda: self.lock_note(index))
+                context_menu.addAction(edit_action)
+                context_menu.addAction(delete_action)
+                context_menu.addAction(lock_action)
+                if self.note_list.history is not None:
+                    history_action = QAction("History", self)
+                    history_action.triggered.connect(lambda: self.show_history(index))
+                    context_menu.addAction(history_action)
+            else:
+                unlock_action = QAction("Unlock Note", self)
+                unlock_action.triggered.connect(lambda: self.unlock_note(index))
+                context_menu.addAction(unlock_action)
+            save_as_txt_action = QAction("Save as .txt", self)
+            save_as_txt_action.triggered.connect(lambda: self.save_as_txt(index))
+            context_menu.addAction(save_as_txt_action)
+            context_menu.exec_(self.note_listbox.mapToGlobal(pos))
+
+    def view_note(self, index):
+        note = self.note_model.note_at(index)
+        if note.locked:
+            random_string = ''.join(random.choices(string.ascii_letters + string.digits, k=20))
+            user_input, ok = QInputDialog.getText(self, "Unlock Note", f"Enter the 20 character string to unlock the note:\n{random_string}")
+            if ok:
+                if user_input == random_string:
+                    timer = start_timer('dialog.view_note')
+                    dialog = self.view_dialog(note)
+                    self.exec_dialog(dialog, timer)
+                else:
+                    QMessageBox.warning(self, "Incorrect String", "The string you entered is incorrect. Please try again.")
+        else:
+            timer = start_timer('dialog.view_note')
+            dialog = self.view_dialog(note)
+            self.exec_dialog(dialog, timer)
+
+    def lock_note(self, index):
+        if self.confirm_action("Confirm Lock", "Are you sure you want to lock this note?"):
+            self.note_model.set_locked(index.row(), True)
+            self.save_notes()
+
+    def unlock_note(self, index):
+        note = self.note_model.note_at(index)
+        if note.locked:
+            random_string = ''.join(random.choices(string.ascii_letters + string.digits, k=20))
+            user_input, ok = QInputDialog.getText(self, "Unlock Note", f"Enter the 20 character string to unlock the note:\n{random_string}")
+            if ok:
+                if user_input == random_string:
+                    self.note_model.set_locked(index.row(), False)
+                    self.save_notes()
+                else:
+                    QMessageBox.warning(self, "Incorrect String", "The string you entered is incorrect. Please try again.")
+        else:
+            QMessageBox.warning(self, "Note Unlocked", "This note is already unlocked.")
+
+        def save_as_txt(self, index):
+            note = self.note_model.note_at(index)
+            filename, _ = QFileDialog.getSaveFileName(self, "Save as .txt", f"{note.title}.txt", "Text Files (*.txt)")
+            if filename:
+                with open(filename, 'w') as f:
+                    f.write(note.content)
+
+    def set_dark_mode(self):
+        self.setStyleSheet("background: qlineargradient(x1:0, y1:0, x2:1, y2:1,stop:0 #2c2c2c, stop:1 black); color: yellow;")
+
+
+    def show_help(self):
+        message = QMessageBox()
+        message.setWindowTitle("Help")
+        message.setText("ProdP - Your Production++ Notepad\n\nFeatures:\n\n- Add Note: Click this button to add a new note.\n\n- Quick Open (Ctrl+P): Fuzzy-find a note by title and open it.\n\n- Search: Type in the search box to filter notes by words in their title or content. The last word matches as a prefix.\n\n- Right Clicks - Select a note then right-click it to View Edit, Delete, Save as, Lock, or Unlock it.\n\n- Developer Mode: Open the Python executor/terminal (ExecutePy.py).\n\n- Import .txt: Import a .txt file into Notelist.\n\n- Bulk Import: Import every matching file in a folder at once, titled by file name or first line.\n\n- Calculator: Open a calculator. What did you expect?\n\n- Ignore: if you view a file named ignore you can't view it, though you can still do the rest of the options.\n\n- Help: Click this button to display this help message.")
+        message.setStyleSheet("background-color: black; color: yellow;")
+        message.exec_()
+
+    def confirm_action(self, title, message):
+        confirm_dialog = QMessageBox()
+        confirm_dialog.setWindowTitle(title)
+        confirm_dialog.setText(message)
+        confirm_dialog.setIcon(QMessageBox.Question)
+        confirm_dialog.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        confirm_dialog.setDefaultButton(QMessageBox.No)
+        return confirm_dialog.exec_() == QMessageBox.Yes
+    
+    def show_note_content(self, index):
+        timer = start_timer('dialog.view_note')
+        note = self.note_model.note_at(index)
+        dialog = self.view_dialog(note)
+        self.exec_dialog(dialog, timer)
+
+    def quick_open(self):
+        timer = start_timer('dialog.quick_open')
+        dialog = QuickOpenDialog(self.trigram_index, self)
+        if self.exec_dialog(dialog, timer):
+            note = dialog.selected_note()
+            if note is not None:
+                timer = start_timer('dialog.view_note')
+                dialog = self.view_dialog(note)
+                self.exec_dialog(dialog, timer)
+
+    def view_dialog(self, note):
+        source = large_note_source(note)
+        if source is not None:
+            return LargeNoteDialog(note.title, source, parent=self)
+        return ViewNoteDialog(note.title, note.content, self)
+
+    def exec_dialog(self, dialog, timer):
+        # The timer stops on the first pass through the dialog's event loop, once it is showing.
+        if timer is not None:
+            QTimer.singleShot(0, timer.stop)
+        return dialog.exec_()
+
+    @timed('filter_notes')
+    def filter_notes(self, query):
+        if query.strip():
+            self.note_model.set_filter(lambda: self.search_index.search(query))
+        else:
+            self.note_model.set_filter(None)
+
+    def delete_note(self, index):
+        if self.settings.get('disable_confirmation', False) or self.confirm_action("Confirm Delete", "Are you sure you want to delete this note?"):
+            self.note_model.remove_note(index.row())
+            self.save_notes()
+
+    def save_as_txt(self, index):
+        note = self.note_model.note_at(index)
+        filename, _ = QFileDialog.getSaveFileName(self, "Save as .txt", f"{note.title}.txt", "Text Files (*.txt)")
+        if filename:
+            with open(filename, 'w') as f:
+                f.write(note.content)
+
+    def view_note(self, index):
+        note = self.note_model.note_at(index)
+        if note.title == "ignore":
+            pass
+        else:
+            timer = start_timer('dialog.view_note')
+            dialog = self.view_dialog(note)
+            self.exec_dialog(dialog, timer)
+
+    def show_developer_mode(self):
+        self.tool_host.open_editor()
+
+    def open_calculator(self):
+        self.tool_host.open_calculator()
+
+    def import_txt(self):
+        filename, _ = QFileDialog.getOpenFileName(self, "Import .txt", filter="Text Files (*.txt)")
+        if filename:
+            with open(filename, 'r') as f:
+                content = f.read()
+            title, ok = QInputDialog.getText(self, "Enter Note Title", "Enter a title for the note:")
+            if ok:
+                self.note_model.add_note(Note(title, content))
+                self.save_notes()
+    def bulk_import(self):
+        directory = QFileDialog.getExistingDirectory(self, "Bulk Import")
+        if not directory:
+            return
+        pattern, ok = QInputDialog.getText(self, "Bulk Import", "Files to import:", text="*.txt")
+        if not ok:
+            return
+        title_from, ok = QInputDialog.getItem(self, "Bulk Import", "Take note titles from:", ["File name", "First line"], 0, False)
+        if not ok:
+            return
+        paths = find_files([directory], pattern)
+        if not paths:
+            QMessageBox.information(self, "Bulk Import", "No matching files found.")
+            return
+
+        importer = BulkImport(paths, 'first_line' if title_from == "First line" else 'filename')
+        progress_dialog = QProgressDialog("Importing notes...", "Cancel", 0, len(paths), self)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        progress_dialog.canceled.connect(importer.cancel)
+        self.import_task = BackgroundTask(importer.read, self)
+        self.import_task.progress.connect(lambda done, total: progress_dialog.setValue(done))
+        self.import_task.done.connect(lambda notes: self.finish_bulk_import(importer, notes, progress_dialog))
+        self.import_task.failed.connect(lambda error: self.finish_bulk_import(importer, None, progress_dialog, error))
+        self.import_task.start()
+
+    def finish_bulk_import(self, importer, notes, progress_dialog, error=None):
+        progress_dialog.reset()
+        if error is not None:
+            QMessageBox.warning(self, "Bulk Import", f"Import failed: {error}")
+            return
+        if notes:
+            self.note_model.add_notes([Note(title, content) for title, content in notes])
+            self.save_notes()
+        if importer.errors:
+            skipped = '\n'.join(f"{path}: {error}" for path, error in importer.errors[:20])
+            QMessageBox.warning(self, "Bulk Import", f"{len(importer.errors)} file(s) could not be imported:\n{skipped}")
+
+    def bulk_export(self):
+        notes = self.note_list.notes
+        entries = list(enumerate(notes))
+        if self.note_model.rows is not None:
+            scope, ok = QInputDialog.getItem(self, "Bulk Export", "Export:", [f"Search results ({len(self.note_model.rows)})", f"All notes ({len(notes)})"], 0, False)
+            if not ok:
+                return
+            if scope.startswith("Search"):
+                positions = {note.id: index for index, note in entries}
+                entries = [(positions[note.id], note) for note in self.note_model.rows]
+        if not entries:
+            QMessageBox.information(self, "Bulk Export", "There are no notes to export.")
+            return
+        formats = {"Text files (.txt)": 'txt', "Zip archive (.zip)": 'zip', "JSON lines (.jsonl)": 'jsonl'}
+        choice, ok = QInputDialog.getItem(self, "Bulk Export", "Export as:", list(formats), 0, False)
+        if not ok:
+            return
+        export_format = formats[choice]
+        if export_format == 'txt':
+            target = QFileDialog.getExistingDirectory(self, "Bulk Export")
+        else:
+            target, _ = QFileDialog.getSaveFileName(self, "Bulk Export", f"notes.{export_format}", f"{choice} (*.{export_format})")
+        if not target:
+            return
+
+        exporter = BulkExport(entries, target, export_format)
+        progress_dialog = QProgressDialog("Exporting notes...", "Cancel", 0, len(entries), self)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        progress_dialog.canceled.connect(exporter.cancel)
+        self.export_task = BackgroundTask(exporter.run, self)
+        self.export_task.progress.connect(lambda done, total: progress_dialog.setValue(done))
+        self.export_task.done.connect(lambda written: self.finish_bulk_export(exporter, written, progress_dialog))
+        self.export_task.failed.connect(lambda error: self.finish_bulk_export(exporter, None, progress_dialog, error))
+        self.export_task.start()
+
+    def finish_bulk_export(self, exporter, written, progress_dialog, error=None):
+        progress_dialog.reset()
+        if error is not None:
+            QMessageBox.warning(self, "Bulk Export", f"Export failed: {error}")
+            return
+        if written is not None:
+            self.statusBar().showMessage(f"Exported {written} note(s) to {exporter.target}", 5000)
+        if exporter.errors:
+            skipped = '\n'.join(f"{title}: {error}" for title, error in exporter.errors[:20])
+            QMessageBox.warning(self, "Bulk Export", f"{len(exporter.errors)} note(s) could not be exported:\n{skipped}")
+
+    def edit_note(self, index):
+        timer = start_timer('dialog.edit_note')
+        note = self.note_model.note_at(index)
+        source = large_note_source(note)
+        if source is not None:
+            self.edit_large_note(index, note, source, timer)
+            return
+        dialog = AddNoteDialog(self)
+        dialog.setWindowTitle("Edit Note")
+        dialog.title_edit.setText(note.title)
+        dialog.content_edit.setPlainText(note.content)
+
+        if self.exec_dialog(dialog, timer):
+            title, content = dialog.get_note_info()
+            if title and content:
+                self.note_model.edit_note(index.row(), title, content)
+                self.save_notes()
+
+    def edit_large_note(self, index, note, source, timer):
+        dialog = LargeNoteDialog(note.title, source, True, self)
+        dialog.setWindowTitle("Edit Note")
+        if self.exec_dialog(dialog, timer):
+            title, content = dialog.get_note_info()
+            if title and (content is not None or title != note.title):
+                self.note_model.edit_note(index.row(), title, note.content if content is None else content)
+                self.save_notes()
+
+    def show_history(self, index):
+        timer = start_timer('dialog.history')
+        note = self.note_model.note_at(index)
+        dialog = HistoryDialog(self.note_list.history, note, self)
+        if self.exec_dialog(dialog, timer) and dialog.selected is not None:
+            title, content = dialog.selected
+            self.note_model.edit_note(index.row(), title, content)
+            self.save_notes()
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = NoteApp()
+    window.show()
     sys.exit(app.exec_())
\ No newline at end of file
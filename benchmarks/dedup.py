@@ -0,0 +1,91 @@
+import argparse
+import glob
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import blobStore
+from noteList import Note, NoteList
+from benchmarks.notebook import make_notes, time_call
+
+# Run from the repository root:
+#   python -m benchmarks.dedup --sizes 10000 100000 --duplicate-fraction 0.5
+# Compares on-disk size and the bytes each save writes for json, pack and the blob store.
+
+def make_duplicated_notes(count, body_bytes, duplicate_fraction, seed):
+    rng = random.Random(seed)
+    templates = [note.content for note in make_notes(20, body_bytes * 4, seed + 1)]
+    for note in make_notes(count, body_bytes, seed):
+        if rng.random() < duplicate_fraction:
+            note.content = rng.choice(templates)
+        yield note
+
+def disk_bytes(filename):
+    return sum(os.path.getsize(path) for path in glob.glob(filename + '*'))
+
+def measure(filename, notes, codec, repeat):
+    blobStore.BlobBackend.codec = codec or blobStore.BLOB_CODEC
+    note_list = NoteList()
+    note_list.notes = note_list.new_store(notes)
+    start = time.perf_counter()
+    note_list.save_notes(filename)
+    first_save_ms = (time.perf_counter() - start) * 1000
+    note_list.close()
+
+    note_list = NoteList()
+    note_list.load_notes(filename)
+    rng = random.Random(1)
+    written = []
+
+    def edit_and_save():
+        index = rng.randrange(len(note_list.notes))
+        note_list.edit_note(index, note_list.notes[index].title, f"edited body {rng.random()}")
+        save = note_list.prepare_save(filename)
+        save.write()
+        save.finish()
+        written.append(getattr(save, 'bytes_written', None) or disk_bytes(filename))
+
+    result = {
+        "disk_bytes": disk_bytes(filename),
+        "first_save_ms": first_save_ms,
+        "load_ms": time_call(lambda: NoteList().load_notes(filename), repeat),
+        "edit_save_ms": time_call(edit_and_save, repeat),
+        "bytes_written_per_save": sorted(written)[len(written) // 2],
+    }
+    note_list.close()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare notebook formats on duplicated, compressible bodies.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000])
+    parser.add_argument('--body-bytes', type=int, default=500)
+    parser.add_argument('--duplicate-fraction', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write results as json to this file")
+    args = parser.parse_args()
+
+    results = []
+    directory = tempfile.mkdtemp(prefix='dedup-bench-')
+    try:
+        for size in args.sizes:
+            notes = list(make_duplicated_notes(size, args.body_bytes, args.duplicate_fraction, args.seed))
+            for name, suffix, codec in (("json", ".json", None), ("pack", ".pack", None), ("store zlib", ".store", 'zlib'), ("store lzma", ".store", 'lzma')):
+                filename = os.path.join(directory, f"notes-{size}-{name.replace(' ', '-')}{suffix}")
+                copies = [Note(note.title, note.content, note.locked) for note in notes]
+                result = {"notes": size, "format": name, "body_bytes": args.body_bytes,
+                          "duplicate_fraction": args.duplicate_fraction}
+                result.update(measure(filename, copies, codec, args.repeat))
+                results.append(result)
+                print(json.dumps(result))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"created": time.strftime('%Y-%m-%dT%H:%M:%S'), "args": vars(args), "results": results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import os
+import sys
+import sysconfig
+import time
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QFont, QSyntaxHighlighter, QTextCharFormat, QTextCursor, QTextDocument
+from PyQt5.QtCore import Qt, QRegExp
+from executePy import PythonHighlighter
+
+# Run from the repository root: python -m benchmarks.highlighter --lines 50000 [files...]
+# Without files, real-world code is taken from the standard library.
+
+class LegacyPythonHighlighter(QSyntaxHighlighter):
+    # The original rule-per-pattern highlighter, kept here as the baseline.
+    def __init__(self, document):
+        super().__init__(document)
+        self.highlighting_rules = []
+
+        keyword_format = QTextCharFormat()
+        keyword_format.setForeground(Qt.red)
+        keyword_format.setFontWeight(QFont.Bold)
+        for keyword in PythonHighlighter.KEYWORDS:
+            pattern = QRegExp(f"\\b{keyword}\\b")
+            self.highlighting_rules.append((pattern, keyword_format))
+
+        string_format = QTextCharFormat()
+        string_format.setForeground(Qt.green)
+        pattern = QRegExp(r'"[^"\\]*(\\.[^"\\]*)*"')
+        self.highlighting_rules.append((pattern, string_format))
+        pattern = QRegExp(r"'[^'\\]*(\\.[^'\\]*)*'")
+        self.highlighting_rules.append((pattern, string_format))
+
+        comment_format = QTextCharFormat()
+        comment_format.setForeground(Qt.darkGray)
+        pattern = QRegExp(r"#.*")
+        self.highlighting_rules.append((pattern, comment_format))
+
+    def highlightBlock(self, text):
+        for pattern, fmt in self.highlighting_rules:
+            expression = QRegExp(pattern)
+            index = expression.indexIn(text)
+            while index >= 0:
+                length = expression.matchedLength()
+                self.setFormat(index, length, fmt)
+                index = expression.indexIn(text, index + length)
+
+def stdlib_source(lines):
+    collected = []
+    directory = sysconfig.get_paths()['stdlib']
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.py'):
+            with open(os.path.join(directory, name), encoding='utf-8', errors='replace') as f:
+                collected.extend(f.read().splitlines())
+            if len(collected) >= lines:
+                break
+    return '\n'.join(collected[:lines])
+
+def counting(highlighter_class):
+    class Counting(highlighter_class):
+        blocks = 0
+
+        def highlightBlock(self, text):
+            Counting.blocks += 1
+            super().highlightBlock(text)
+    return Counting
+
+def measure(highlighter_class, source):
+    highlighter_class = counting(highlighter_class)
+    document = QTextDocument()
+    document.documentLayout()
+    highlighter = highlighter_class(document)
+
+    start = time.perf_counter()
+    document.setPlainText(source)
+    full = time.perf_counter() - start
+
+    # Edit a line in the middle of the file that is not already inside a string.
+    block = document.findBlockByNumber(document.blockCount() // 2)
+    while block.next().isValid() and block.previous().userState() > 0:
+        block = block.next()
+    cursor = QTextCursor(block)
+    highlighter_class.blocks = 0
+    start = time.perf_counter()
+    cursor.insertText("x = 1  # edited ")
+    edit = time.perf_counter() - start
+    edit_blocks = highlighter_class.blocks
+
+    cursor.movePosition(QTextCursor.StartOfBlock)
+    highlighter_class.blocks = 0
+    start = time.perf_counter()
+    cursor.insertText('"""')
+    quote = time.perf_counter() - start
+    quote_blocks = highlighter_class.blocks
+    highlighter.setDocument(None)
+    return full, edit, edit_blocks, quote, quote_blocks
+
+def main():
+    parser = argparse.ArgumentParser(description="Time syntax highlighting of large Python files.")
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--lines', type=int, default=50000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication.instance() or QApplication(sys.argv)
+    sources = []
+    for filename in args.files:
+        with open(filename, encoding='utf-8', errors='replace') as f:
+            sources.append((filename, f.read()))
+    if not sources:
+        sources.append((f"stdlib ({args.lines} lines)", stdlib_source(args.lines)))
+
+    for name, source in sources:
+        print(name)
+        print(f"  {'highlighter':<10}{'full s':>9}{'edit ms':>10}{'blocks':>8}{'open quote ms':>14}{'blocks':>8}")
+        for label, highlighter_class in (("legacy", LegacyPythonHighlighter), ("current", PythonHighlighter)):
+            full, edit, edit_blocks, quote, quote_blocks = measure(highlighter_class, source)
+            print(f"  {label:<10}{full:>9.2f}{edit * 1000:>10.2f}{edit_blocks:>8}{quote * 1000:>14.1f}{quote_blocks:>8}")
+    app.processEvents()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import gc
+import tracemalloc
+from noteList import Note, NoteList, CompactNoteList, NotePack, PackedContent
+
+# Run from the repository root: python -m benchmarks.noteMemory --notes 1000000
+
+class DictNote:
+    # The original per-instance-dict Note, kept here as the baseline.
+    def __init__(self, title, content, locked=False):
+        self.title = title
+        self.content = content
+        self.locked = locked
+
+def build_dict_notes(count, pack):
+    return [DictNote(f"Note {i}", PackedContent(pack, i * 64, 64), i % 7 == 0) for i in range(count)]
+
+def build_note_list(count, pack):
+    note_list = NoteList()
+    note_list.notes = note_list.new_store(Note(f"Note {i}", PackedContent(pack, i * 64, 64), i % 7 == 0) for i in range(count))
+    return note_list
+
+def build_compact_note_list(count, pack):
+    note_list = CompactNoteList()
+    note_list.notes = note_list.new_store(Note(f"Note {i}", PackedContent(pack, i * 64, 64), i % 7 == 0) for i in range(count))
+    return note_list
+
+def measure(build, count, pack):
+    gc.collect()
+    tracemalloc.start()
+    result = build(count, pack)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory used by the note stores.")
+    parser.add_argument('--notes', type=int, default=100000)
+    args = parser.parse_args()
+
+    # Bodies are references into a pack, so the numbers cover the per-note overhead only.
+    pack = NotePack.__new__(NotePack)
+    print(f"{'store':<20}{'MB':>10}{'peak MB':>10}{'bytes/note':>12}")
+    for name, build in (("dict Note + list", build_dict_notes), ("slotted Note + list", build_note_list), ("CompactNoteList", build_compact_note_list)):
+        size, peak = measure(build, args.notes, pack)
+        print(f"{name:<20}{size / 1e6:>10.1f}{peak / 1e6:>10.1f}{size / args.notes:>12.1f}")
+
+if __name__ == '__main__':
+    main()
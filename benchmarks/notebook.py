@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from noteList import Note, NoteList
+
+# Run from the repository root:
+#   python -m benchmarks.notebook --sizes 1000 10000 100000 1000000 --body-bytes 500 --output results.json
+# List refresh runs against an offscreen QApplication; pass --no-gui to skip it.
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+         "et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi").split()
+
+def make_notes(count, body_bytes, seed):
+    rng = random.Random(seed)
+    pool = ' '.join(rng.choice(WORDS) for _ in range(max(body_bytes, 64) * 4 // 5))
+    for i in range(count):
+        start = rng.randrange(len(pool) - body_bytes) if len(pool) > body_bytes else 0
+        yield Note(f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}", pool[start:start + body_bytes], i % 50 == 0)
+
+def write_notebook(filename, count, body_bytes, seed):
+    note_list = NoteList()
+    note_list.notes = note_list.new_store(make_notes(count, body_bytes, seed))
+    note_list.save_notes(filename)
+    note_list.close()
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def measure_load(filename, repeat):
+    def load():
+        note_list = NoteList()
+        note_list.load_notes(filename)
+        note_list.close()
+    load_ms = time_call(load, repeat)
+    tracemalloc.start()
+    note_list = NoteList()
+    note_list.load_notes(filename)
+    resident, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return load_ms, peak, resident, note_list
+
+def measure_edit_save(note_list, filename, repeat):
+    rng = random.Random(1)
+    def edit_and_save():
+        index = rng.randrange(len(note_list.notes))
+        note_list.edit_note(index, note_list.notes[index].title, "edited body")
+        note_list.save_notes(filename)
+    return time_call(edit_and_save, repeat)
+
+def measure_journal_edit(note_list, filename, repeat):
+    rng = random.Random(2)
+    note_list.open_journal(filename, compact_threshold=1 << 40)
+    def edit():
+        index = rng.randrange(len(note_list.notes))
+        note_list.edit_note(index, note_list.notes[index].title, "journaled body")
+    timing = time_call(edit, repeat)
+    note_list.close_journal()
+    os.remove(filename + '.journal')
+    return timing
+
+class ListRefresh:
+    def __init__(self):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication, QListView
+        from NotepadExpanded import NoteListModel
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.QListView = QListView
+        self.NoteListModel = NoteListModel
+
+    def measure(self, note_list, repeat):
+        model = self.NoteListModel(note_list)
+        view = self.QListView()
+        # Same view settings as NoteApp.
+        view.setUniformItemSizes(True)
+        view.setLayoutMode(self.QListView.Batched)
+        view.setModel(model)
+        view.resize(400, 600)
+        view.show()
+        self.app.processEvents()
+
+        def refresh():
+            model.reset()
+            self.app.processEvents()
+
+        def edit():
+            model.edit_note(0, "refreshed", "refreshed body")
+            self.app.processEvents()
+
+        def add():
+            model.add_note(Note("added", "added body"))
+            self.app.processEvents()
+
+        results = {
+            "refresh_ms": time_call(refresh, repeat),
+            "edit_refresh_ms": time_call(edit, repeat),
+            "add_refresh_ms": time_call(add, repeat),
+        }
+        view.close()
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notebook load, save and list refresh.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--body-bytes', type=int, default=500)
+    parser.add_argument('--formats', nargs='+', default=['json', 'pack'], choices=['json', 'pack', 'db'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-gui', action='store_true', help="skip the list refresh measurements")
+    parser.add_argument('--output', help="write results as json to this file")
+    args = parser.parse_args()
+
+    list_refresh = None if args.no_gui else ListRefresh()
+    results = []
+    directory = tempfile.mkdtemp(prefix='notebook-bench-')
+    try:
+        for size in args.sizes:
+            for fmt in args.formats:
+                filename = os.path.join(directory, f"notes-{size}.{fmt}")
+                start = time.perf_counter()
+                write_notebook(filename, size, args.body_bytes, args.seed)
+                generate_s = time.perf_counter() - start
+
+                load_ms, peak, resident, note_list = measure_load(filename, args.repeat)
+                result = {
+                    "notes": size,
+                    "format": fmt,
+                    "body_bytes": args.body_bytes,
+                    "file_bytes": os.path.getsize(filename),
+                    "generate_s": generate_s,
+                    "load_ms": load_ms,
+                    "load_peak_bytes": peak,
+                    "resident_bytes": resident,
+                    "edit_save_ms": measure_edit_save(note_list, filename, args.repeat),
+                    "journal_edit_ms": measure_journal_edit(note_list, filename, args.repeat) if fmt == 'json' else None,
+                }
+                if list_refresh:
+                    result.update(list_refresh.measure(note_list, args.repeat))
+                note_list.close()
+                os.remove(filename)
+                results.append(result)
+                print(json.dumps(result))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if args.output:
+        report = {
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+            "results": results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import difflib
+import random
+import statistics
+import time
+from noteList import Note
+from noteSearch import TrigramIndex
+
+# Run from the repository root: python -m benchmarks.quickOpen --sizes 1000 10000 100000
+
+WORDS = ["meeting", "notes", "project", "todo", "shopping", "list", "ideas", "draft", "report", "budget",
+         "travel", "plan", "recipe", "journal", "weekly", "review", "backup", "server", "release", "design"]
+
+def make_title(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))) + f" {rng.randint(0, 99999)}"
+
+def make_query(rng, title):
+    query = list(title[:rng.randint(4, 12)])
+    position = rng.randrange(len(query))
+    query[position] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+    return ''.join(query)
+
+def linear_search(notes, query, limit=20):
+    scored = [(difflib.SequenceMatcher(None, query, note.title.lower()).ratio(), note) for note in notes]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [note for score, note in scored[:limit]]
+
+def time_queries(search, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Quick-open latency against collection size.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--linear-limit', type=int, default=20000, help="largest size to run the difflib scan on")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'notes':>8}{'build ms':>10}{'trigram p50':>13}{'p95':>8}{'cached p50':>12}{'linear p50':>12}")
+    for size in args.sizes:
+        notes = [Note(make_title(rng), '') for _ in range(size)]
+        queries = [make_query(rng, rng.choice(notes).title) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        index = TrigramIndex(notes)
+        build = (time.perf_counter() - start) * 1000
+
+        def uncached(query):
+            index.cache.clear()
+            return index.search(query)
+
+        trigram_p50, trigram_p95 = time_queries(uncached, queries)
+        for query in queries:
+            index.search(query)
+        cached_p50, _ = time_queries(index.search, queries)
+        if size <= args.linear_limit:
+            linear_p50 = f"{time_queries(lambda query: linear_search(notes, query), queries[:10])[0]:.2f}"
+        else:
+            linear_p50 = "-"
+        print(f"{size:>8}{build:>10.0f}{trigram_p50:>13.2f}{trigram_p95:>8.2f}{cached_p50:>12.3f}{linear_p50:>12}")
+
+if __name__ == '__main__':
+    main()
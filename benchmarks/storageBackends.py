@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from noteList import Note, NoteList
+from benchmarks.notebook import make_notes, time_call, WORDS
+
+# Run from the repository root:
+#   python -m benchmarks.storageBackends --sizes 1000 10000 100000 --output backends.json
+# Every change is timed until it is on disk: a full rewrite for json, one appended line for
+# the journal, one transaction for sqlite.
+
+def open_notebook(filename, journal):
+    note_list = NoteList()
+    note_list.load_notes(filename)
+    if journal:
+        note_list.open_journal(filename, compact_threshold=1 << 40)
+    return note_list
+
+def persist(note_list, filename):
+    if not note_list.writes_through():
+        note_list.save_notes(filename)
+
+def measure(filename, journal, repeat, seed):
+    rng = random.Random(seed)
+    load_ms = time_call(lambda: open_notebook(filename, False).close(), repeat)
+    note_list = open_notebook(filename, journal)
+    search_index = note_list.open_search_index()
+    note_list.add_listener(search_index)
+
+    def add():
+        note_list.add_note(Note("added note", "added body " + rng.choice(WORDS)))
+        persist(note_list, filename)
+
+    def edit():
+        index = rng.randrange(len(note_list.notes))
+        note_list.edit_note(index, note_list.notes[index].title, "edited body " + rng.choice(WORDS))
+        persist(note_list, filename)
+
+    def lock():
+        index = rng.randrange(len(note_list.notes))
+        note_list.set_locked(index, not note_list.notes[index].locked)
+        persist(note_list, filename)
+
+    def remove():
+        note_list.remove_note(rng.randrange(len(note_list.notes)))
+        persist(note_list, filename)
+
+    def search():
+        search_index.search(f"{rng.choice(WORDS)} {rng.choice(WORDS)[:3]}", 50)
+
+    result = {
+        "load_ms": load_ms,
+        "add_ms": time_call(add, repeat),
+        "edit_ms": time_call(edit, repeat),
+        "lock_ms": time_call(lock, repeat),
+        "remove_ms": time_call(remove, repeat),
+        "search_ms": time_call(search, repeat),
+    }
+    note_list.close()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the json and sqlite storage backends.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--body-bytes', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write results as json to this file")
+    args = parser.parse_args()
+
+    results = []
+    directory = tempfile.mkdtemp(prefix='backend-bench-')
+    try:
+        for size in args.sizes:
+            json_filename = os.path.join(directory, f"notes-{size}.json")
+            db_filename = os.path.join(directory, f"notes-{size}.db")
+            note_list = NoteList()
+            note_list.notes = note_list.new_store(make_notes(size, args.body_bytes, args.seed))
+            note_list.save_notes(json_filename)
+            start = time.perf_counter()
+            note_list.save_notes(db_filename)
+            migrate_ms = (time.perf_counter() - start) * 1000
+            note_list.close()
+
+            for backend, filename, journal in (("json", json_filename, False), ("json+journal", json_filename, True), ("sqlite", db_filename, False)):
+                result = {"notes": size, "backend": backend, "body_bytes": args.body_bytes,
+                          "file_bytes": os.path.getsize(filename),
+                          "migrate_ms": migrate_ms if backend == "sqlite" else None}
+                result.update(measure(filename, journal, args.repeat, args.seed))
+                results.append(result)
+                print(json.dumps(result))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"created": time.strftime('%Y-%m-%dT%H:%M:%S'), "args": vars(args), "results": results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
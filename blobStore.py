@@ -0,0 +1,266 @@
+import hashlib
+import json
+import lzma
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from noteList import Note, NoteJournal, JsonBackend, NotebookChanged, NotebookMerge, file_lock, file_stamp, write_atomic
+
+BLOB_CODEC = 'zlib'
+BLOB_CACHE_BYTES = 32 * 1024 * 1024
+COMPRESS_MIN_BYTES = 64
+GC_MIN_BYTES = 1024 * 1024
+GC_GARBAGE_RATIO = 0.5
+
+DECOMPRESS = {'raw': bytes, 'zlib': zlib.decompress, 'lzma': lzma.decompress}
+
+def blob_digest(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+def compress(data, codec):
+    if len(data) >= COMPRESS_MIN_BYTES:
+        packed = zlib.compress(data, 6) if codec == 'zlib' else lzma.compress(data)
+        if len(packed) < len(data):
+            return codec, packed
+    return 'raw', data
+
+def data_path(filename, generation):
+    return f"{filename}.{generation}.blobs"
+
+class BlobStore:
+    # Note bodies kept once per content hash, compressed, back to back in one data file. The
+    # notebook index maps each hash to [offset, length, codec]. Bytes past the indexed end were
+    # written by a save that never finished, or by one still in progress in another process, and
+    # are left alone; the next save appends after them.
+    def __init__(self, path, blobs, end, cache_bytes=BLOB_CACHE_BYTES):
+        self.path = path
+        self.blobs = blobs
+        self.end = end
+        self.lock = threading.Lock()
+        if not os.path.exists(path):
+            open(path, 'wb').close()
+        self.file = open(path, 'rb')
+        self.cache = OrderedDict()
+        self.cache_size = 0
+        self.cache_bytes = cache_bytes
+
+    def read_raw(self, digest):
+        offset, length, codec = self.blobs[digest]
+        with self.lock:
+            self.file.seek(offset)
+            return codec, self.file.read(length)
+
+    def read(self, digest):
+        # Decompressed bodies of recently opened notes stay in an LRU cache bounded in characters.
+        with self.lock:
+            text = self.cache.get(digest)
+            if text is not None:
+                self.cache.move_to_end(digest)
+                return text
+        codec, data = self.read_raw(digest)
+        text = DECOMPRESS[codec](data).decode('utf-8')
+        with self.lock:
+            if digest not in self.cache:
+                self.cache[digest] = text
+                self.cache_size += len(text)
+            while self.cache_size > self.cache_bytes and len(self.cache) > 1:
+                _, evicted = self.cache.popitem(last=False)
+                self.cache_size -= len(evicted)
+        return text
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+class BlobContent:
+    __slots__ = ('store', 'digest')
+
+    def __init__(self, store, digest):
+        self.store = store
+        self.digest = digest
+
+    def read(self):
+        return self.store.read(self.digest)
+
+class BlobSave:
+    # Appends only blobs the store does not have yet, then rewrites the small index. Once more
+    # than GC_GARBAGE_RATIO of the data file is unreferenced, live blobs are copied into a new
+    # generation instead and the old file is deleted after the index points at the new one. Like
+    # JsonSave, it refuses to write over an index another process saved since this one read it.
+    def __init__(self, note_list, backend):
+        self.note_list = note_list
+        self.backend = backend
+        self.store = backend.store
+        self.codec = backend.codec
+        self.expected = backend.stamp
+        self.stamp = None
+        self.journal_seq = note_list.journal_seq
+        self.notes = [(note, note.title, note.locked, note._content, note.id) for note in note_list.notes]
+        self.known = dict(self.store.blobs) if self.store else {}
+        self.generation = backend.generation
+        self.entries = []
+        self.blobs = None
+        self.end = 0
+        self.bytes_written = 0
+
+    def write(self):
+        new_blobs = OrderedDict()
+        for note, title, locked, content, note_id in self.notes:
+            if isinstance(content, BlobContent) and content.store is self.store:
+                digest = content.digest
+            else:
+                data = (content if isinstance(content, str) else content.read()).encode('utf-8')
+                digest = blob_digest(data)
+                if digest not in self.known and digest not in new_blobs:
+                    new_blobs[digest] = compress(data, self.codec)
+            self.entries.append([title, locked, digest, note_id])
+
+        # Compressing happens before the lock; appending and the index write happen under it.
+        with file_lock(self.backend.filename):
+            if self.expected is not None and file_stamp(self.backend.filename) != self.expected:
+                raise NotebookChanged(self.backend.filename)
+            referenced = {entry[2] for entry in self.entries}
+            new_bytes = sum(len(packed) for _, packed in new_blobs.values())
+            total = (os.path.getsize(self.store.path) if self.store else 0) + new_bytes
+            live = new_bytes + sum(self.known[digest][1] for digest in referenced if digest in self.known)
+            if self.store is None or (total >= GC_MIN_BYTES and total - live > total * GC_GARBAGE_RATIO):
+                self.write_generation(referenced, new_blobs)
+            else:
+                self.append(new_blobs)
+            index = {"journal_seq": self.journal_seq, "generation": self.generation, "end": self.end,
+                     "blobs": self.blobs, "notes": self.entries}
+            data = json.dumps(index)
+            write_atomic(self.backend.filename, data)
+            self.stamp = file_stamp(self.backend.filename)
+            self.bytes_written += len(data)
+
+    def append(self, new_blobs):
+        self.blobs = dict(self.known)
+        with open(self.store.path, 'ab') as f:
+            # The real end, which is past the indexed one if an earlier save was cut short.
+            start = offset = f.seek(0, os.SEEK_END)
+            for digest, (codec, packed) in new_blobs.items():
+                f.write(packed)
+                self.blobs[digest] = [offset, len(packed), codec]
+                offset += len(packed)
+            f.flush()
+            os.fsync(f.fileno())
+        self.bytes_written += offset - start
+        self.end = offset
+
+    def write_generation(self, referenced, new_blobs):
+        self.generation += 1
+        self.blobs = {}
+        offset = 0
+        with open(data_path(self.backend.filename, self.generation), 'wb') as f:
+            for digest in self.known:
+                if digest in referenced:
+                    codec, packed = self.store.read_raw(digest)
+                    f.write(packed)
+                    self.blobs[digest] = [offset, len(packed), codec]
+                    offset += len(packed)
+            for digest, (codec, packed) in new_blobs.items():
+                f.write(packed)
+                self.blobs[digest] = [offset, len(packed), codec]
+                offset += len(packed)
+            f.flush()
+            os.fsync(f.fileno())
+        self.bytes_written += offset
+        self.end = offset
+
+    def finish(self):
+        if self.note_list.backend is not self.backend:
+            return
+        self.backend.set_base(self.entries, self.stamp)
+        store = self.store
+        if self.generation != self.backend.generation:
+            old_store = store
+            store = self.backend.store = BlobStore(data_path(self.backend.filename, self.generation), self.blobs, self.end)
+            self.backend.generation = self.generation
+            if old_store is not None:
+                store.cache, store.cache_size = old_store.cache, old_store.cache_size
+                old_store.close()
+                os.remove(old_store.path)
+        else:
+            with store.lock:
+                store.blobs = self.blobs
+                store.end = self.end
+        for (note, _, _, content, _), (_, _, digest, _) in zip(self.notes, self.entries):
+            # Bodies edited since prepare stay in memory until the next save picks them up.
+            current = note._content
+            if current is content or isinstance(current, BlobContent):
+                note.content = BlobContent(store, digest)
+
+class BlobBackend(JsonBackend):
+    # A .store notebook is a json index of titles, flags, content hashes and note ids. Bodies
+    # live in a BlobStore data file beside it, deduplicated and compressed. The base is kept as
+    # (title, locked, hash) per note id, so a merge only reads bodies whose hash changed.
+    codec = BLOB_CODEC
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self.store = None
+        self.generation = 0
+
+    def read_index(self):
+        with file_lock(self.filename):
+            with open(self.filename, 'r') as f:
+                index = json.load(f)
+            stamp = file_stamp(self.filename)
+        return index, stamp
+
+    def load(self, note_list):
+        index, stamp = self.read_index()
+        self.close()
+        self.generation = index['generation']
+        self.store = BlobStore(data_path(self.filename, self.generation), index['blobs'], index['end'])
+        # Left behind if the last garbage collection was interrupted after the index was written.
+        stale_path = data_path(self.filename, self.generation - 1)
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+        note_list.notes = note_list.new_store(Note(title, BlobContent(self.store, digest), locked, note_id) for title, locked, digest, note_id in index['notes'])
+        note_list.journal_seq = index.get('journal_seq', 0)
+        if NoteJournal.replay(note_list, self.filename):
+            self.set_base([], None)
+        else:
+            self.set_base(index['notes'], stamp)
+
+    def set_base(self, entries, stamp):
+        self.base = {note_id: (title, locked, digest) for title, locked, digest, note_id in entries}
+        self.stamp = stamp
+
+    def merge(self, note_list):
+        index, stamp = self.read_index()
+        # Bodies are read by the open store for our side and a fresh one for theirs. Notes that
+        # still point at the open store keep it alive until the next save moves them over.
+        store = BlobStore(data_path(self.filename, index['generation']), index['blobs'], index['end'])
+        base = {}
+        theirs = []
+        their_ids = set()
+        for title, locked, digest, note_id in index['notes']:
+            their_ids.add(note_id)
+            old = self.base.get(note_id)
+            if old == (title, locked, digest):
+                fields = {"title": title, "locked": locked, "content": digest}
+                base[note_id] = fields
+            else:
+                fields = {"title": title, "locked": locked, "content": store.read(digest)}
+            fields["id"] = note_id
+            theirs.append(fields)
+        for note_id, (title, locked, digest) in self.base.items():
+            if note_id not in base:
+                base[note_id] = {"title": title, "locked": locked, "content": self.store.read(digest)}
+        merge = NotebookMerge(base, note_list.notes, theirs)
+        self.store = store
+        self.generation = index['generation']
+        self.set_base(index['notes'], stamp)
+        return merge
+
+    def prepare_save(self, note_list):
+        return BlobSave(note_list, self)
+
+    def close(self):
+        if self.store:
+            self.store.close()
+            self.store = None
@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+EXPORT_FORMATS = ('txt', 'zip', 'jsonl')
+NAME_LENGTH = 100
+PENDING_PER_WORKER = 4
+
+UNSAFE_NAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+def export_name(title, used):
+    # A .txt file name for the note that is valid on Windows and not already taken.
+    base = UNSAFE_NAME_CHARS.sub('_', title).strip(' .')[:NAME_LENGTH] or 'note'
+    name = f"{base}.txt"
+    number = 2
+    while name.lower() in used:
+        name = f"{base} ({number}).txt"
+        number += 1
+    used.add(name.lower())
+    return name
+
+def read_body(note, content):
+    if isinstance(content, str):
+        return content
+    try:
+        return content.read()
+    except ValueError:
+        # A save replaced the .pack this body was mapped from; the note now points at the new one.
+        return note.content
+
+class BulkExport:
+    # Writes notes as .txt files in a directory, one zip archive or json lines. Bodies are read and
+    # encoded on a thread pool and handed to the writer in order, with only a few notes per worker
+    # in flight, so memory does not grow with the size of the notebook.
+    def __init__(self, entries, target, format='jsonl', workers=None):
+        # entries are (index, note) pairs; titles and content references are taken now, on the
+        # caller's thread. target is a directory for txt, a path for zip, a path or stream for jsonl.
+        self.entries = [(index, note, note.title, note.locked, note.id, note._content) for index, note in entries]
+        self.target = target
+        self.format = format
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.errors = []
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self, progress=None):
+        # Returns the number of notes written, or None if cancelled. Zip and json lines files are
+        # written beside the target and only moved into place once complete.
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            if self.format == 'txt':
+                return self.write_files(executor, progress)
+            if hasattr(self.target, 'write'):
+                return self.write_lines(executor, self.target, progress)
+            tmp_path = self.target + '.tmp'
+            try:
+                if self.format == 'zip':
+                    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                        written = self.write_archive(executor, archive, progress)
+                else:
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        written = self.write_lines(executor, f, progress)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            if written is None:
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, self.target)
+            return written
+
+    def prepared(self, executor, prepare, entries):
+        # Results in note order, submitting at most PENDING_PER_WORKER notes per worker ahead of the writer.
+        pending = deque()
+        limit = self.workers * PENDING_PER_WORKER
+        try:
+            for entry in entries:
+                if self.cancelled.is_set():
+                    break
+                pending.append(executor.submit(prepare, entry))
+                if len(pending) >= limit:
+                    yield pending.popleft().result()
+            while pending and not self.cancelled.is_set():
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def finish(self, written, progress):
+        if progress:
+            progress(written, len(self.entries))
+
+    def write_files(self, executor, progress):
+        os.makedirs(self.target, exist_ok=True)
+        used = {name.lower() for name in os.listdir(self.target)}
+        named = [(export_name(entry[2], used), entry) for entry in self.entries]
+        written = 0
+        for done, error in enumerate(self.prepared(executor, self.write_file, named), 1):
+            if error is None:
+                written += 1
+            else:
+                self.errors.append(error)
+            self.finish(done, progress)
+        return None if self.cancelled.is_set() else written
+
+    def write_file(self, named):
+        name, (_, note, title, _, _, content) = named
+        try:
+            with open(os.path.join(self.target, name), 'w', encoding='utf-8') as f:
+                f.write(read_body(note, content))
+        except OSError as error:
+            return title, error
+        return None
+
+    def write_archive(self, executor, archive, progress):
+        used = set()
+        written = 0
+        for title, data in self.prepared(executor, self.encode_body, self.entries):
+            archive.writestr(export_name(title, used), data)
+            written += 1
+            self.finish(written, progress)
+        return None if self.cancelled.is_set() else written
+
+    def encode_body(self, entry):
+        _, note, title, _, _, content = entry
+        return title, read_body(note, content).encode('utf-8')
+
+    def write_lines(self, executor, output, progress):
+        written = 0
+        for line in self.prepared(executor, self.encode_line, self.entries):
+            output.write(line)
+            written += 1
+            self.finish(written, progress)
+        return None if self.cancelled.is_set() else written
+
+    def encode_line(self, entry):
+        index, note, title, locked, note_id, content = entry
+        record = {"index": index, "id": note_id, "title": title, "locked": locked, "content": read_body(note, content)}
+        return json.dumps(record) + '\n'
@@ -0,0 +1,81 @@
+import fnmatch
+import glob
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+MMAP_THRESHOLD = 16 * 1024 * 1024
+TITLE_LENGTH = 100
+
+def find_files(sources, pattern='*.txt'):
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                paths.extend(os.path.join(root, name) for name in sorted(files) if fnmatch.fnmatch(name, pattern))
+        else:
+            paths.extend(sorted(glob.glob(source)))
+    return paths
+
+def decode(data):
+    try:
+        text = str(data, 'utf-8-sig')
+    except UnicodeDecodeError:
+        text = str(data, 'cp1252', 'replace')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n')
+    return text
+
+def read_text(path):
+    # Large files are decoded straight out of a memory map instead of being read into a bytes copy first.
+    if os.path.getsize(path) >= MMAP_THRESHOLD:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return decode(mm)
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+def make_title(path, content, title_from):
+    if title_from == 'first_line':
+        for line in content[:64 * 1024].splitlines():
+            if line.strip():
+                return line.strip()[:TITLE_LENGTH]
+    return os.path.splitext(os.path.basename(path))[0]
+
+def read_note(path, title_from='filename'):
+    content = read_text(path)
+    return make_title(path, content, title_from), content
+
+class BulkImport:
+    def __init__(self, paths, title_from='filename', workers=None, processes=False):
+        self.paths = paths
+        self.title_from = title_from
+        self.workers = workers
+        self.processes = processes
+        self.errors = []
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def read(self, progress=None):
+        # Returns (title, content) pairs in path order, or None if cancelled. Unreadable files are
+        # skipped and listed in self.errors.
+        pool = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        results = [None] * len(self.paths)
+        with pool(max_workers=self.workers) as executor:
+            futures = {executor.submit(read_note, path, self.title_from): i for i, path in enumerate(self.paths)}
+            for done, future in enumerate(as_completed(futures), 1):
+                if self.cancelled.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    return None
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except (OSError, ValueError) as error:
+                    self.errors.append((self.paths[i], error))
+                if progress:
+                    progress(done, len(self.paths))
+        return [result for result in results if result is not None]
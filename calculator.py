@@ -1,3 +1,7 @@
-import webbrowser
-
-webbrowser.open('ms-calculator://')
\ No newline at end of file
+import webbrowser
+
+def open_calculator():
+    webbrowser.open('ms-calculator://')
+
+if __name__ == "__main__":
+    open_calculator()
@@ -0,0 +1,390 @@
+import builtins
+import codecs
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+MAX_RUNS = 50
+POOL_SIZE = 2
+PENDING_LIMIT = 1024 * 1024
+FLUSH_INTERVAL = 0.05
+FLUSH_SIZE = 8192
+SYNC_MARKER = b'\x00codeRunner-sync\x00'
+SYNC_TIMEOUT = 1.0
+
+# Workers speak json lines: the editor sends {"code", "keep", "directory"} and the worker answers
+# with {"stream", "data"} chunks while the code runs, then {"done", "ok", "retire"}.
+
+class Worker:
+    def __init__(self, preload=()):
+        self.runs = 0
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', os.path.abspath(__file__), '--worker'] + list(preload),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def send(self, code, keep=False, directory=None):
+        self.runs += 1
+        self.process.stdin.write(json.dumps({"code": code, "keep": keep, "directory": directory}).encode('utf-8') + b'\n')
+        self.process.stdin.flush()
+
+    def read_message(self):
+        line = self.process.stdout.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def messages(self):
+        while True:
+            message = self.read_message()
+            if message is None:
+                yield {"stream": "stderr", "data": f"Worker exited with code {self.process.wait()}\n"}
+                yield {"done": True, "ok": False, "crashed": True}
+                return
+            yield message
+            if message.get('done'):
+                return
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+        self.process.stdout.close()
+
+class WorkerPool:
+    # Pre-started interpreters reused across runs. Workers are replaced after a crash or after
+    # max_runs runs. With persistent=True every run shares one worker and its namespace.
+    def __init__(self, size=POOL_SIZE, max_runs=MAX_RUNS, persistent=False, preload=()):
+        self.size = size
+        self.max_runs = max_runs
+        self.persistent = persistent
+        self.preload = preload
+        self.lock = threading.Lock()
+        self.idle = []
+        self.session = None
+        self.closed = False
+        for _ in range(size):
+            self.idle.append(Worker(preload))
+
+    def acquire(self):
+        with self.lock:
+            if self.persistent:
+                if self.session is None or not self.session.alive():
+                    self.session = Worker(self.preload)
+                return self.session
+            while self.idle:
+                worker = self.idle.pop()
+                if worker.alive():
+                    return worker
+                worker.kill()
+        return Worker(self.preload)
+
+    def release(self, worker, crashed=False):
+        if worker is self.session:
+            if crashed:
+                worker.kill()
+                self.session = None
+            return
+        if crashed or self.closed or worker.runs >= self.max_runs or not worker.alive():
+            worker.kill()
+            threading.Thread(target=self.refill, daemon=True).start()
+            return
+        with self.lock:
+            self.idle.append(worker)
+
+    def refill(self):
+        worker = Worker(self.preload)
+        with self.lock:
+            if self.closed or len(self.idle) >= self.size:
+                keep = False
+            else:
+                self.idle.append(worker)
+                keep = True
+        if not keep:
+            worker.kill()
+
+    def set_persistent(self, persistent):
+        self.persistent = persistent
+        if not persistent:
+            self.reset_session()
+
+    def reset_session(self):
+        with self.lock:
+            session, self.session = self.session, None
+        if session is not None:
+            session.kill()
+
+    def run(self, code, directory=None):
+        # Runs code to completion and returns (output, ok).
+        run = Run(self, code, limit=None, directory=directory)
+        run.run()
+        return run.take_output(), run.ok
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            workers, self.idle = self.idle, []
+            session, self.session = self.session, None
+        for worker in workers + [session]:
+            if worker is not None:
+                worker.kill()
+
+class Run:
+    # One execution on a pool worker, read on its own thread. Output piles up in a bounded buffer
+    # that the caller drains with take_output(); the oldest chunks are dropped past the limit.
+    # directory goes first on sys.path, as the script's own directory does for python script.py.
+    def __init__(self, pool, code, limit=PENDING_LIMIT, directory=None):
+        self.pool = pool
+        self.code = code
+        self.limit = limit
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.pending = deque()
+        self.pending_size = 0
+        self.dropped = 0
+        self.worker = None
+        self.stopped = False
+        self.ok = False
+        self.finished = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        worker = self.pool.acquire()
+        with self.lock:
+            self.worker = worker
+            stopped = self.stopped
+        crashed = False
+        try:
+            if not stopped:
+                worker.send(self.code, keep=worker is self.pool.session, directory=self.directory)
+                for message in worker.messages():
+                    if message.get('done'):
+                        self.ok = message['ok']
+                        # A worker that imported the user's own modules is replaced like a crashed one.
+                        crashed = message.get('crashed', False) or message.get('retire', False)
+                    else:
+                        self.append(message['data'])
+        except OSError as error:
+            self.append(f"Worker failed: {error}\n")
+            crashed = True
+        self.pool.release(worker, crashed)
+        self.finished.set()
+
+    def append(self, data):
+        with self.lock:
+            self.pending.append(data)
+            self.pending_size += len(data)
+            while self.limit is not None and self.pending_size > self.limit and len(self.pending) > 1:
+                self.pending_size -= len(self.pending.popleft())
+                self.dropped += 1
+
+    def take_output(self):
+        with self.lock:
+            output = ''.join(self.pending)
+            if self.dropped:
+                output = f"[... {self.dropped} output chunk(s) dropped ...]\n" + output
+            self.pending.clear()
+            self.pending_size = 0
+            self.dropped = 0
+        return output
+
+    def interrupt(self):
+        # Raises KeyboardInterrupt in the running code where signals allow it, otherwise kills the worker.
+        with self.lock:
+            self.stopped = True
+            worker = self.worker
+        if worker is None or self.finished.is_set():
+            return
+        if os.name == 'posix':
+            os.kill(worker.process.pid, signal.SIGINT)
+        else:
+            self.kill()
+
+    def kill(self):
+        with self.lock:
+            worker = self.worker
+        if worker is not None and not self.finished.is_set() and worker.alive():
+            worker.process.kill()
+
+class Channel:
+    def __init__(self, out):
+        self.out = out
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        with self.lock:
+            self.out.write(json.dumps(message).encode('utf-8') + b'\n')
+            self.out.flush()
+
+class OutputBuffer:
+    # Batches writes into chunks: flushed when the stream switches, when FLUSH_SIZE is reached,
+    # and every FLUSH_INTERVAL by a background thread so slow output still shows up promptly.
+    def __init__(self, channel):
+        self.channel = channel
+        self.lock = threading.RLock()
+        self.stream = None
+        self.chunks = []
+        self.size = 0
+        threading.Thread(target=self.flush_periodically, daemon=True).start()
+
+    def write(self, stream, data):
+        with self.lock:
+            if stream != self.stream:
+                self.flush()
+                self.stream = stream
+            self.chunks.append(data)
+            self.size += len(data)
+            if self.size >= FLUSH_SIZE:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            if self.chunks:
+                self.channel.send({"stream": self.stream, "data": ''.join(self.chunks)})
+                self.chunks = []
+                self.size = 0
+
+    def flush_periodically(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+
+class StreamWriter:
+    def __init__(self, buffer, stream):
+        self.buffer = buffer
+        self.stream = stream
+
+    def write(self, data):
+        if data:
+            self.buffer.write(self.stream, data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+class FdRelay:
+    # Points fd at a pipe and forwards whatever arrives on it, from C extensions, os.write or child
+    # processes, into the output buffer as stream. sync() returns once everything written to fd
+    # before it has been forwarded, by writing SYNC_MARKER through the pipe and waiting for it.
+    def __init__(self, fd, output, stream):
+        read_fd, write_fd = os.pipe()
+        os.dup2(write_fd, fd)
+        os.close(write_fd)
+        self.fd = fd
+        self.read_fd = read_fd
+        self.output = output
+        self.stream = stream
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self.synced = threading.Semaphore(0)
+        threading.Thread(target=self.relay, daemon=True).start()
+
+    def relay(self):
+        pending = b''
+        while True:
+            data = os.read(self.read_fd, 65536)
+            if not data:
+                return
+            pending += data
+            marker = pending.find(SYNC_MARKER)
+            while marker >= 0:
+                self.forward(pending[:marker])
+                pending = pending[marker + len(SYNC_MARKER):]
+                self.synced.release()
+                marker = pending.find(SYNC_MARKER)
+            # Hold back a tail that could be the start of a marker split across reads.
+            keep = len(SYNC_MARKER) - 1
+            while keep and not pending.endswith(SYNC_MARKER[:keep]):
+                keep -= 1
+            self.forward(pending[:len(pending) - keep])
+            pending = pending[len(pending) - keep:]
+
+    def forward(self, data):
+        text = self.decoder.decode(data)
+        if text:
+            self.output.write(self.stream, text)
+
+    def sync(self):
+        os.write(self.fd, SYNC_MARKER)
+        self.synced.acquire(timeout=SYNC_TIMEOUT)
+
+SYSTEM_PREFIXES = tuple({os.path.join(prefix, '') for prefix in (sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix)})
+
+def user_module(module):
+    # True for modules loaded from outside the Python installation, such as the user's own files.
+    path = getattr(module, '__file__', None)
+    return bool(path) and not os.path.abspath(path).startswith(SYSTEM_PREFIXES)
+
+def worker_main(preload):
+    # Keep the protocol pipes to ourselves: fd 0 is pointed at devnull, and fds 1 and 2 at pipes
+    # relayed as stdout and stderr chunks, so user code and its children cannot touch them.
+    requests = os.fdopen(os.dup(0), 'rb')
+    channel = Channel(os.fdopen(os.dup(1), 'wb'))
+    os.dup2(2, 1)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+
+    for module in preload:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+    output = OutputBuffer(channel)
+    relays = [FdRelay(1, output, 'stdout'), FdRelay(2, output, 'stderr')]
+    namespace = None
+    for line in requests:
+        request = json.loads(line)
+        keep = request['keep']
+        if namespace is None or not keep:
+            namespace = {'__name__': '__main__', '__builtins__': builtins}
+        if not keep:
+            # A fresh run must not see the directory or sys.path a previous run left behind.
+            modules = set(sys.modules)
+            path = list(sys.path)
+            cwd = os.getcwd()
+        # '' when there is no script, like python -c.
+        sys.path[0] = request.get('directory') or ''
+        sys.stdout = StreamWriter(output, 'stdout')
+        sys.stderr = StreamWriter(output, 'stderr')
+        sys.argv = ['-c']
+        ok = True
+        try:
+            exec(compile(request['code'], '<string>', 'exec'), namespace)
+        except SystemExit as error:
+            ok = error.code in (None, 0)
+            if not ok and not isinstance(error.code, int):
+                sys.stderr.write(f"{error.code}\n")
+        except BaseException as error:
+            ok = False
+            sys.stderr.write(''.join(traceback.format_exception(type(error), error, error.__traceback__.tb_next)))
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+        for relay in relays:
+            relay.sync()
+        output.flush()
+        retire = False
+        if not keep:
+            # Modules stay loaded in sys.modules, so one that came from the user's files would be
+            # stale on the next run; the worker is retired instead.
+            retire = any(user_module(module) for name, module in list(sys.modules.items()) if name not in modules)
+            sys.path[:] = path
+            os.chdir(cwd)
+        channel.send({"done": True, "ok": ok, "retire": retire})
+
+if __name__ == '__main__' and sys.argv[1:2] == ['--worker']:
+    worker_main(sys.argv[2:])
@@ -0,0 +1,117 @@
+import time
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QCheckBox, QTableWidget, QTableWidgetItem, QPushButton, QTextEdit, QFileDialog, QHeaderView
+from PyQt5.QtCore import QObject, QTimer
+from perfStats import metrics
+
+STALL_POLL_MS = 20
+STALL_THRESHOLD_MS = 50
+REFRESH_MS = 1000
+
+class StallMonitor(QObject):
+    # A timer that should fire every STALL_POLL_MS; when it fires late, the event loop was busy
+    # for that long and the delay is recorded as a stall.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.last = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(STALL_POLL_MS)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def tick(self):
+        now = time.perf_counter()
+        lag = now - self.last - STALL_POLL_MS / 1000
+        self.last = now
+        if lag * 1000 >= STALL_THRESHOLD_MS:
+            metrics.record('event_loop_stall', lag)
+
+class DiagnosticsWindow(QWidget):
+    COLUMNS = ("Metric", "Count", "p50 ms", "p95 ms", "Max ms")
+
+    def __init__(self, stall_monitor, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.stall_monitor = stall_monitor
+        layout = QVBoxLayout(self)
+
+        options = QHBoxLayout()
+        self.record_check = QCheckBox("Record timings")
+        self.record_check.setChecked(metrics.enabled)
+        self.record_check.toggled.connect(self.set_recording)
+        options.addWidget(self.record_check)
+        self.profile_check = QCheckBox("cProfile capture")
+        self.profile_check.setChecked(metrics.profiler is not None)
+        self.profile_check.toggled.connect(self.set_profiling)
+        options.addWidget(self.profile_check)
+        layout.addLayout(options)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.profile_output = QTextEdit()
+        self.profile_output.setReadOnly(True)
+        self.profile_output.setPlaceholderText("Turn cProfile capture on, use the app, then turn it off to see the profile here.")
+        layout.addWidget(self.profile_output)
+
+        buttons = QHBoxLayout()
+        export_button = QPushButton("Export JSON...")
+        export_button.clicked.connect(self.export)
+        buttons.addWidget(export_button)
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.reset)
+        buttons.addWidget(reset_button)
+        layout.addLayout(buttons)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.resize(640, 480)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def set_recording(self, enabled):
+        metrics.enabled = enabled
+        if enabled:
+            self.stall_monitor.start()
+        else:
+            self.stall_monitor.stop()
+
+    def set_profiling(self, enabled):
+        if enabled:
+            metrics.start_profile()
+            return
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Profile", "notepad.prof", "Profile Files (*.prof)")
+        self.profile_output.setPlainText(metrics.stop_profile(filename or None))
+
+    def refresh(self):
+        summary = metrics.summary()
+        self.table.setRowCount(len(summary))
+        for row, (name, values) in enumerate(summary.items()):
+            cells = (name, str(values['count']), f"{values['p50_ms']:.1f}", f"{values['p95_ms']:.1f}", f"{values['max_ms']:.1f}")
+            for column, text in enumerate(cells):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+
+    def export(self):
+        filename, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "metrics.json", "JSON Files (*.json)")
+        if filename:
+            metrics.export(filename)
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
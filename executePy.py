@@ -1,222 +1,572 @@
-import sys
-import subprocess
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTextEdit, QFileDialog, QAction, QVBoxLayout, QWidget, QPlainTextEdit, QPushButton, QMessageBox, QMenu, QInputDialog
-from PyQt5.QtGui import QCursor, QKeySequence, QSyntaxHighlighter, QTextCharFormat, QColor, QFont
-from PyQt5.QtCore import Qt, QRegExp
-import webbrowser
-import pyperclip
-
-class OutputTextEdit(QPlainTextEdit):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-
-    def keyPressEvent(self, event):
-        pass
-
-class PythonHighlighter(QSyntaxHighlighter):
-    def __init__(self, document):
-        super().__init__(document)
-        self.highlighting_rules = []
-
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(Qt.red)
-        keyword_format.setFontWeight(QFont.Bold)
-        keywords = [
-            "def", "class", "import", "from", "return", "if", "elif", "else", 
-            "for", "while", "try", "except", "finally", "with", "as", "pass", 
-            "break", "continue", "in", "is", "not", "and", "or", "print", 
-            "exec", "eval"
-        ]
-        for keyword in keywords:
-            pattern = QRegExp(f"\\b{keyword}\\b")
-            self.highlighting_rules.append((pattern, keyword_format))
-
-        string_format = QTextCharFormat()
-        string_format.setForeground(Qt.green)
-        pattern = QRegExp(r'"[^"\\]*(\\.[^"\\]*)*"')
-        self.highlighting_rules.append((pattern, string_format))
-        pattern = QRegExp(r"'[^'\\]*(\\.[^'\\]*)*'")
-        self.highlighting_rules.append((pattern, string_format))
-
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(Qt.darkGray)
-        pattern = QRegExp(r"#.*")
-        self.highlighting_rules.append((pattern, comment_format))
-
-    def highlightBlock(self, text):
-        for pattern, fmt in self.highlighting_rules:
-            expression = QRegExp(pattern)
-            index = expression.indexIn(text)
-            while index >= 0:
-                length = expression.matchedLength()
-                self.setFormat(index, length, fmt)
-                index = expression.indexIn(text, index + length)
-
-class TextEditor(QMainWindow):
-    def __init__(self):
-        super().__init__()
-
-        self.text_edit = QTextEdit()
-        self.highlighter = PythonHighlighter(self.text_edit.document())
-
-        self.output_edit = OutputTextEdit()
-        self.clear_terminal_button = QPushButton('Clear Terminal')
-        self.clear_terminal_button.clicked.connect(self.clear_terminal)
-        self.central_widget = QWidget()
-        self.central_layout = QVBoxLayout(self.central_widget)
-        self.central_layout.addWidget(self.text_edit)
-        self.central_layout.addWidget(self.output_edit)
-        self.central_layout.addWidget(self.clear_terminal_button)
-
-        self.setCentralWidget(self.central_widget)
-
-        self.init_ui()
-
-    def init_ui(self):
-        new_action = QAction('New', self)
-        new_action.setShortcut('Ctrl+N')
-        new_action.triggered.connect(self.new_file)
-
-        open_action = QAction('Open', self)
-        open_action.setShortcut('Ctrl+O')
-        open_action.triggered.connect(self.open_file)
-
-        save_action = QAction('Save', self)
-        save_action.setShortcut('Ctrl+S')
-        save_action.triggered.connect(self.save_file)
-
-        save_as_action = QAction('Save As', self)
-        save_as_action.setShortcut('Ctrl+Shift+S')
-        save_as_action.triggered.connect(self.save_as_file)
-
-        run_menu = QMenu('Run', self)
-        run_code_action = QAction('Run Code', self)
-        run_code_action.setShortcut('Ctrl+R')
-        run_code_action.triggered.connect(self.run_code)
-        run_menu.addAction(run_code_action)
-
-        menubar = self.menuBar()
-        file_menu = menubar.addMenu('File')
-        file_menu.addAction(new_action)
-        file_menu.addAction(open_action)
-        file_menu.addAction(save_action)
-        file_menu.addAction(save_as_action)
-
-        menubar.addMenu(run_menu)
-
-        menubar.addMenu(self.create_resources_menu())
-
-        self.setWindowTitle('Text Editor')
-        self.setGeometry(100, 100, 800, 600)
-
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #1e1e1e;
-            }
-            QTextEdit, QPlainTextEdit {
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                selection-background-color: #264f78;
-                selection-color: #ffffff;
-            }
-            QPushButton {
-                background-color: #264f78;
-                color: #ffffff;
-                border: 1px solid #264f78;
-                padding: 5px;
-            }
-            QPushButton:hover {
-                background-color: #1e1e1e;
-                border: 1px solid #ffffff;
-            }
-            QMenuBar {
-                background-color: #2d2d30;
-            }
-            QMenuBar::item {
-                background-color: #2d2d30;
-                color: #d4d4d4;
-            }
-            QMenuBar::item:selected {
-                background-color: #264f78;
-            }
-            QMenu {
-                background-color: #2d2d30;
-                border: 1px solid #1e1e1e;
-            }
-            QMenu::item {
-                background-color: #2d2d30;
-                color: #d4d4d4;
-            }
-            QMenu::item:selected {
-                background-color: #264f78;
-            }
-            """)
-
-    def new_file(self):
-        self.text_edit.clear()
-        self.setWindowTitle('Text Editor')
-
-    def open_file(self):
-        file_dialog = QFileDialog()
-        file_path, _ = file_dialog.getOpenFileName(self, 'Open File')
-        if file_path:
-            with open(file_path, 'r') as file:
-                content = file.read()
-                self.text_edit.setPlainText(content)
-                self.setWindowTitle(f'Text Editor - {file_path}')
-
-    def save_file(self):
-        if not hasattr(self, 'current_file_path') or not self.current_file_path:
-            self.save_as_file()
-        else:
-            with open(self.current_file_path, 'w') as file:
-                file.write(self.text_edit.toPlainText())
-                self.setWindowTitle(f'Text Editor - {self.current_file_path}')
-
-    def save_as_file(self):
-        file_dialog = QFileDialog()
-        file_path, _ = file_dialog.getSaveFileName(self, 'Save File')
-        if file_path:
-            self.current_file_path = file_path
-            self.save_file()
-
-    def clear_terminal(self):
-        self.output_edit.clear()
-
-    def create_resources_menu(self):
-        resources_menu = QMenu('Resources', self)
-        python_docs_action = QAction('Python Docs', self)
-        python_docs_action.triggered.connect(lambda: self.open_python_docs())
-        resources_menu.addAction(python_docs_action)
-        create_rgb_action = QAction('Create RGB', self)
-        create_rgb_action.setShortcut('Ctrl+M')  
-        create_rgb_action.triggered.connect(lambda: self.open_rgb_maker())
-        resources_menu.addAction(create_rgb_action)
-        calculator_action = QAction('Calculator', self)
-        calculator_action.setShortcut('Ctrl+Shift+C') 
-        calculator_action.triggered.connect(lambda: self.open_calculator())
-        resources_menu.addAction(calculator_action)
-        return resources_menu
-
-    def open_python_docs(self):
-        webbrowser.open('https://docs.python.org/3/reference/index.html')
-
-    def open_rgb_maker(self):
-        subprocess.Popen(['python', 'rgbMaker.py'])
-
-    def open_calculator(self):
-        subprocess.Popen(['calc'])
-
-    def run_code(self):
-        code = self.text_edit.toPlainText()
-        try:
-            result = subprocess.check_output(['python', '-c', code], stderr=subprocess.STDOUT, text=True)
-            self.output_edit.appendPlainText(result)
-        except subprocess.CalledProcessError as e:
-            self.output_edit.appendPlainText(f"Error: {e.output}")
-
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    editor = TextEditor()
-    editor.show()
-    sys.exit(app.exec_())
+import os
+import re
+import sys
+import queue
+import shutil
+import threading
+import time
+import codecs
+from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QAction, QVBoxLayout, QWidget, QPlainTextEdit, QPushButton, QMessageBox, QMenu, QInputDialog
+from PyQt5.QtGui import QCursor, QKeySequence, QSyntaxHighlighter, QTextCharFormat, QColor, QFont, QTextCursor
+from PyQt5.QtCore import Qt, QTimer
+import webbrowser
+import pyperclip
+from codeRunner import WorkerPool, Run
+from pagedView import PagedTextViewer, MappedSource
+from toolHost import ToolHost
+from perfStats import start_timer
+
+OUTPUT_MAX_LINES = 10000
+OUTPUT_POLL_MS = 50
+STOP_TIMEOUT_MS = 2000
+LARGE_FILE_BYTES = 1024 * 1024
+MAPPED_VIEW_BYTES = 64 * 1024 * 1024
+FILE_CHUNK_CHARS = 256 * 1024
+FILE_POLL_MS = 16
+FILE_TICK_SECONDS = 0.008
+
+class FileLoad:
+    # Reads and decodes a file on a background thread. The GUI takes chunks for a few milliseconds
+    # per timer tick so it stays responsive; the queue is bounded so the reader never runs far ahead
+    # of it. A file that is not valid UTF-8 is still shown, with replacement characters, but marked
+    # lossy so it is never written back over the original. newline is the file's line ending,
+    # '\r\n' when most lines end that way, so a save can write it back.
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.position = 0
+        self.chunks = queue.Queue(maxsize=8)
+        self.error = None
+        self.lossy = False
+        self.newline = '\n'
+        self.cancelled = False
+        self.thread = threading.Thread(target=self.read, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def read(self):
+        try:
+            with open(self.path, 'rb') as raw:
+                decoder = codecs.getincrementaldecoder('utf-8')()
+                carry = ''
+                crlf = lf = 0
+                while not self.cancelled:
+                    data = raw.read(FILE_CHUNK_CHARS)
+                    pending = decoder.getstate()[0]
+                    try:
+                        chunk = decoder.decode(data, not data)
+                    except UnicodeDecodeError:
+                        self.lossy = True
+                        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+                        chunk = decoder.decode(pending + data, not data)
+                    # A \r at the end is held back: inserted apart from the \n that follows it,
+                    # each would become a line break of its own.
+                    chunk = carry + chunk
+                    carry = ''
+                    if data and chunk.endswith('\r'):
+                        chunk, carry = chunk[:-1], '\r'
+                    crlf += chunk.count('\r\n')
+                    lf += chunk.count('\n')
+                    self.position = raw.tell()
+                    if chunk:
+                        self.put(chunk)
+                    if not data:
+                        break
+                if crlf * 2 > lf:
+                    self.newline = '\r\n'
+        except OSError as e:
+            self.error = str(e)
+        self.put(None)
+
+    def put(self, item):
+        while not self.cancelled:
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def take(self):
+        try:
+            return self.chunks.get_nowait()
+        except queue.Empty:
+            return ''
+
+    def cancel(self):
+        self.cancelled = True
+
+class FileSave:
+    # Writes text to a temporary file beside the target in slices, then swaps it into place so an
+    # interrupted save never leaves a half-written file behind.
+    def __init__(self, path, text, newline=None):
+        self.path = path
+        self.text = text
+        self.newline = newline
+        self.error = None
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self.write, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def write(self):
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline=self.newline) as file:
+                for start in range(0, len(self.text), FILE_CHUNK_CHARS):
+                    file.write(self.text[start:start + FILE_CHUNK_CHARS])
+                file.flush()
+                os.fsync(file.fileno())
+            if os.path.exists(self.path):
+                shutil.copymode(self.path, tmp_path)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.error = str(e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.text = None
+        self.finished.set()
+
+class MappedFileWindow(QMainWindow):
+    def __init__(self, path):
+        super().__init__()
+        self.viewer = PagedTextViewer(MappedSource(path))
+        self.setCentralWidget(self.viewer)
+        self.setWindowTitle(f'Text Editor - {path} [read-only]')
+        self.setGeometry(120, 120, 800, 600)
+
+    def closeEvent(self, event):
+        self.viewer.close_source()
+        super().closeEvent(event)
+
+class OutputTextEdit(QPlainTextEdit):
+    # Keeps only the last max_lines lines; older ones are dropped as new output arrives.
+    def __init__(self, parent=None, max_lines=OUTPUT_MAX_LINES):
+        super().__init__(parent)
+        self.setMaximumBlockCount(max_lines)
+
+    def append_output(self, text):
+        self.moveCursor(QTextCursor.End)
+        self.insertPlainText(text)
+        self.moveCursor(QTextCursor.End)
+
+    def start_line(self):
+        if self.document().lastBlock().length() > 1:
+            self.append_output('\n')
+
+    def keyPressEvent(self, event):
+        pass
+
+class PythonHighlighter(QSyntaxHighlighter):
+    # One combined regex pass per block. Block state records an open triple-quoted string so
+    # Qt only re-highlights following lines when that state actually changes.
+    KEYWORDS = [
+        "def", "class", "import", "from", "return", "if", "elif", "else",
+        "for", "while", "try", "except", "finally", "with", "as", "pass",
+        "break", "continue", "in", "is", "not", "and", "or", "print",
+        "exec", "eval"
+    ]
+    TOKEN_RE = re.compile(
+        r'(?P<comment>#.*)'
+        r'|(?P<triple>\'\'\'|""")'
+        r'|(?P<string>"[^"\\]*(?:\\.[^"\\]*)*"|\'[^\'\\]*(?:\\.[^\'\\]*)*\')'
+        r'|(?P<keyword>\b(?:' + '|'.join(KEYWORDS) + r')\b)'
+    )
+    TRIPLE_END_RE = {"'''": re.compile(r"(?:[^'\\]|\\.|'(?!''))*'''"), '"""': re.compile(r'(?:[^"\\]|\\.|"(?!""))*"""')}
+    STATES = {"'''": 1, '"""': 2}
+    DELIMITERS = {1: "'''", 2: '"""'}
+
+    def __init__(self, document):
+        super().__init__(document)
+        keyword_format = QTextCharFormat()
+        keyword_format.setForeground(Qt.red)
+        keyword_format.setFontWeight(QFont.Bold)
+        string_format = QTextCharFormat()
+        string_format.setForeground(Qt.green)
+        comment_format = QTextCharFormat()
+        comment_format.setForeground(Qt.darkGray)
+        self.formats = {
+            'keyword': keyword_format,
+            'string': string_format,
+            'triple': string_format,
+            'comment': comment_format,
+        }
+
+    def highlightBlock(self, text):
+        # Qt positions count UTF-16 units; only lines with characters outside the BMP need mapping.
+        offsets = None
+        if not text.isascii() and any(ord(char) > 0xFFFF for char in text):
+            offsets = [0]
+            for char in text:
+                offsets.append(offsets[-1] + (2 if ord(char) > 0xFFFF else 1))
+
+        def set_format(start, end, fmt):
+            if offsets:
+                start, end = offsets[start], offsets[end]
+            self.setFormat(start, end - start, fmt)
+
+        string_format = self.formats['string']
+        position = 0
+        state = self.previousBlockState()
+        if state in self.DELIMITERS:
+            match = self.TRIPLE_END_RE[self.DELIMITERS[state]].match(text)
+            if match is None:
+                set_format(0, len(text), string_format)
+                self.setCurrentBlockState(state)
+                return
+            position = match.end()
+            set_format(0, position, string_format)
+
+        self.setCurrentBlockState(0)
+        while True:
+            match = self.TOKEN_RE.search(text, position)
+            if match is None:
+                return
+            kind = match.lastgroup
+            if kind == 'triple':
+                delimiter = match.group()
+                end = self.TRIPLE_END_RE[delimiter].match(text, match.end())
+                if end is None:
+                    set_format(match.start(), len(text), string_format)
+                    self.setCurrentBlockState(self.STATES[delimiter])
+                    return
+                set_format(match.start(), end.end(), string_format)
+                position = end.end()
+            else:
+                set_format(match.start(), match.end(), self.formats[kind])
+                position = match.end()
+
+class TextEditor(QMainWindow):
+    def __init__(self, tool_host=None):
+        super().__init__()
+
+        self.tool_host = tool_host or ToolHost()
+
+        self.text_edit = QPlainTextEdit()
+        self.highlighter = PythonHighlighter(self.text_edit.document())
+
+        self.output_edit = OutputTextEdit()
+        self.clear_terminal_button = QPushButton('Clear Terminal')
+        self.clear_terminal_button.clicked.connect(self.clear_terminal)
+        self.central_widget = QWidget()
+        self.central_layout = QVBoxLayout(self.central_widget)
+        self.central_layout.addWidget(self.text_edit)
+        self.central_layout.addWidget(self.output_edit)
+        self.central_layout.addWidget(self.clear_terminal_button)
+
+        self.setCentralWidget(self.central_widget)
+
+        self.worker_pool = WorkerPool()
+        self.current_run = None
+        self.run_timer = None
+        self.output_timer = QTimer(self)
+        self.output_timer.setInterval(OUTPUT_POLL_MS)
+        self.output_timer.timeout.connect(self.drain_output)
+
+        self.current_file_path = None
+        self.current_load = None
+        self.current_save = None
+        self.current_lossy = False
+        self.current_newline = None
+        self.mapped_windows = []
+        self.file_timer = QTimer(self)
+        self.file_timer.setInterval(FILE_POLL_MS)
+        self.file_timer.timeout.connect(self.poll_files)
+
+        self.init_ui()
+
+    def init_ui(self):
+        new_action = QAction('New', self)
+        new_action.setShortcut('Ctrl+N')
+        new_action.triggered.connect(self.new_file)
+
+        open_action = QAction('Open', self)
+        open_action.setShortcut('Ctrl+O')
+        open_action.triggered.connect(self.open_file)
+
+        save_action = QAction('Save', self)
+        save_action.setShortcut('Ctrl+S')
+        save_action.triggered.connect(self.save_file)
+
+        save_as_action = QAction('Save As', self)
+        save_as_action.setShortcut('Ctrl+Shift+S')
+        save_as_action.triggered.connect(self.save_as_file)
+
+        run_menu = QMenu('Run', self)
+        run_code_action = QAction('Run Code', self)
+        run_code_action.setShortcut('Ctrl+R')
+        run_code_action.triggered.connect(self.run_code)
+        run_menu.addAction(run_code_action)
+        stop_action = QAction('Stop', self)
+        stop_action.setShortcut('Ctrl+Shift+X')
+        stop_action.triggered.connect(self.stop_code)
+        run_menu.addAction(stop_action)
+        keep_session_action = QAction('Keep Session', self)
+        keep_session_action.setCheckable(True)
+        keep_session_action.toggled.connect(self.worker_pool.set_persistent)
+        run_menu.addAction(keep_session_action)
+        restart_session_action = QAction('Restart Session', self)
+        restart_session_action.triggered.connect(self.worker_pool.reset_session)
+        run_menu.addAction(restart_session_action)
+        line_limit_action = QAction('Terminal Line Limit...', self)
+        line_limit_action.triggered.connect(self.set_output_line_limit)
+        run_menu.addAction(line_limit_action)
+
+        menubar = self.menuBar()
+        file_menu = menubar.addMenu('File')
+        file_menu.addAction(new_action)
+        file_menu.addAction(open_action)
+        file_menu.addAction(save_action)
+        file_menu.addAction(save_as_action)
+
+        menubar.addMenu(run_menu)
+
+        menubar.addMenu(self.create_resources_menu())
+
+        self.setWindowTitle('Text Editor')
+        self.setGeometry(100, 100, 800, 600)
+
+        self.setStyleSheet("""
+            QMainWindow {
+                background-color: #1e1e1e;
+            }
+            QTextEdit, QPlainTextEdit {
+                background-color: #1e1e1e;
+                color: #d4d4d4;
+                selection-background-color: #264f78;
+                selection-color: #ffffff;
+            }
+            QPushButton {
+                background-color: #264f78;
+                color: #ffffff;
+                border: 1px solid #264f78;
+                padding: 5px;
+            }
+            QPushButton:hover {
+                background-color: #1e1e1e;
+                border: 1px solid #ffffff;
+            }
+            QMenuBar {
+                background-color: #2d2d30;
+            }
+            QMenuBar::item {
+                background-color: #2d2d30;
+                color: #d4d4d4;
+            }
+            QMenuBar::item:selected {
+                background-color: #264f78;
+            }
+            QMenu {
+                background-color: #2d2d30;
+                border: 1px solid #1e1e1e;
+            }
+            QMenu::item {
+                background-color: #2d2d30;
+                color: #d4d4d4;
+            }
+            QMenu::item:selected {
+                background-color: #264f78;
+            }
+            """)
+
+    def new_file(self):
+        self.cancel_load()
+        self.text_edit.clear()
+        self.highlighter.setDocument(self.text_edit.document())
+        self.current_file_path = None
+        self.current_lossy = False
+        self.current_newline = None
+        self.setWindowTitle('Text Editor')
+
+    def open_file(self):
+        file_dialog = QFileDialog()
+        file_path, _ = file_dialog.getOpenFileName(self, 'Open File')
+        if file_path:
+            self.load_file(file_path)
+
+    def load_file(self, file_path):
+        try:
+            size = os.path.getsize(file_path)
+        except OSError as e:
+            QMessageBox.warning(self, 'Open File', str(e))
+            return
+        if size >= MAPPED_VIEW_BYTES:
+            answer = QMessageBox.question(self, 'Open File',
+                                          f'This file is {size // (1024 * 1024)} MB. Open it in the read-only viewer instead?',
+                                          QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
+            if answer == QMessageBox.Cancel:
+                return
+            if answer == QMessageBox.Yes:
+                window = MappedFileWindow(file_path)
+                window.destroyed.connect(lambda: self.mapped_windows.remove(window))
+                window.setAttribute(Qt.WA_DeleteOnClose)
+                self.mapped_windows.append(window)
+                window.show()
+                return
+        self.cancel_load()
+        # Highlighting a multi-megabyte file costs more than it helps, so large files load plain.
+        self.highlighter.setDocument(None if size >= LARGE_FILE_BYTES else self.text_edit.document())
+        self.text_edit.clear()
+        self.text_edit.setUndoRedoEnabled(False)
+        self.text_edit.setReadOnly(True)
+        self.current_file_path = file_path
+        self.current_lossy = False
+        self.current_newline = None
+        self.setWindowTitle(f'Text Editor - {file_path}')
+        self.current_load = FileLoad(file_path)
+        self.current_load.start()
+        self.file_timer.start()
+
+    def cancel_load(self):
+        if self.current_load is not None:
+            self.current_load.cancel()
+            self.current_load = None
+            self.text_edit.setReadOnly(False)
+            self.text_edit.setUndoRedoEnabled(True)
+
+    def poll_files(self):
+        load = self.current_load
+        if load is not None:
+            deadline = time.monotonic() + FILE_TICK_SECONDS
+            chunk = load.take()
+            while chunk:
+                cursor = QTextCursor(self.text_edit.document())
+                cursor.movePosition(QTextCursor.End)
+                cursor.insertText(chunk)
+                if load.size:
+                    self.statusBar().showMessage(f'Loading... {load.position * 100 // load.size}%')
+                chunk = load.take() if time.monotonic() < deadline else ''
+            if chunk is None:
+                self.current_load = None
+                self.current_lossy = load.lossy
+                self.current_newline = load.newline
+                self.text_edit.setReadOnly(load.lossy)
+                self.text_edit.setUndoRedoEnabled(True)
+                if load.error:
+                    self.statusBar().clearMessage()
+                    QMessageBox.warning(self, 'Open File', load.error)
+                elif load.lossy:
+                    self.statusBar().clearMessage()
+                    self.setWindowTitle(f'Text Editor - {load.path} [read-only]')
+                    QMessageBox.information(self, 'Open File', 'This file is not valid UTF-8, so it was opened read-only.')
+                else:
+                    self.statusBar().showMessage(f'Loaded {load.path}', 3000)
+        save = self.current_save
+        if save is not None and save.finished.is_set():
+            self.current_save = None
+            if save.error:
+                self.statusBar().clearMessage()
+                QMessageBox.warning(self, 'Save File', save.error)
+            else:
+                self.statusBar().showMessage(f'Saved {save.path}', 3000)
+        if self.current_load is None and self.current_save is None:
+            self.file_timer.stop()
+
+    def save_file(self):
+        if not self.current_file_path:
+            self.save_as_file()
+        elif self.current_load is not None:
+            QMessageBox.information(self, 'Save File', 'The file is still loading.')
+        elif self.current_save is not None:
+            QMessageBox.information(self, 'Save File', 'A save is already in progress.')
+        elif self.current_lossy:
+            QMessageBox.information(self, 'Save File', 'This file is not valid UTF-8 and was opened read-only.')
+        else:
+            self.statusBar().showMessage('Saving...')
+            self.current_save = FileSave(self.current_file_path, self.text_edit.toPlainText(), self.current_newline)
+            self.current_save.start()
+            self.file_timer.start()
+            self.setWindowTitle(f'Text Editor - {self.current_file_path}')
+
+    def save_as_file(self):
+        file_dialog = QFileDialog()
+        file_path, _ = file_dialog.getSaveFileName(self, 'Save File')
+        if file_path:
+            self.current_file_path = file_path
+            self.save_file()
+
+    def clear_terminal(self):
+        self.output_edit.clear()
+
+    def create_resources_menu(self):
+        resources_menu = QMenu('Resources', self)
+        python_docs_action = QAction('Python Docs', self)
+        python_docs_action.triggered.connect(lambda: self.open_python_docs())
+        resources_menu.addAction(python_docs_action)
+        create_rgb_action = QAction('Create RGB', self)
+        create_rgb_action.setShortcut('Ctrl+M')  
+        create_rgb_action.triggered.connect(lambda: self.open_rgb_maker())
+        resources_menu.addAction(create_rgb_action)
+        calculator_action = QAction('Calculator', self)
+        calculator_action.setShortcut('Ctrl+Shift+C') 
+        calculator_action.triggered.connect(lambda: self.open_calculator())
+        resources_menu.addAction(calculator_action)
+        return resources_menu
+
+    def open_python_docs(self):
+        webbrowser.open('https://docs.python.org/3/reference/index.html')
+
+    def open_rgb_maker(self):
+        self.tool_host.open_rgb_maker()
+
+    def open_calculator(self):
+        self.tool_host.open_calculator()
+
+    def run_code(self):
+        if self.current_run is not None:
+            QMessageBox.information(self, 'Run Code', 'Code is already running. Stop it first.')
+            return
+        self.output_edit.start_line()
+        self.run_timer = start_timer('run_code')
+        directory = os.path.dirname(os.path.abspath(self.current_file_path)) if self.current_file_path else None
+        self.current_run = Run(self.worker_pool, self.text_edit.toPlainText(), directory=directory)
+        self.current_run.start()
+        self.output_timer.start()
+        self.setWindowTitle(f'{self.windowTitle()} [running]')
+
+    def drain_output(self):
+        run = self.current_run
+        finished = run.finished.is_set()
+        output = run.take_output()
+        if output:
+            self.output_edit.append_output(output)
+        if finished:
+            self.output_timer.stop()
+            self.current_run = None
+            if self.run_timer is not None:
+                self.run_timer.stop()
+            if run.stopped:
+                self.output_edit.start_line()
+                self.output_edit.append_output('[Stopped]\n')
+            elif not run.ok:
+                self.output_edit.start_line()
+                self.output_edit.append_output('Error: the code did not finish successfully.\n')
+            self.setWindowTitle(self.windowTitle().replace(' [running]', ''))
+
+    def stop_code(self):
+        run = self.current_run
+        if run is not None:
+            run.interrupt()
+            QTimer.singleShot(STOP_TIMEOUT_MS, run.kill)
+
+    def set_output_line_limit(self):
+        limit, ok = QInputDialog.getInt(self, 'Terminal Line Limit', 'Lines to keep in the terminal:',
+                                        self.output_edit.maximumBlockCount(), 100, 10000000)
+        if ok:
+            self.output_edit.setMaximumBlockCount(limit)
+
+    def closeEvent(self, event):
+        self.cancel_load()
+        if self.current_save is not None:
+            self.current_save.thread.join()
+        if self.current_run is not None:
+            self.current_run.kill()
+        self.worker_pool.close()
+        super().closeEvent(event)
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    editor = TextEditor()
+    editor.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,180 @@
+import difflib
+import hashlib
+import json
+import os
+import threading
+import time
+
+KEYFRAME_INTERVAL = 32
+HISTORY_MAX_REVISIONS = 200
+HISTORY_COMPACT_BYTES = 4 * 1024 * 1024
+DELTA_MAX_LINE_PAIRS = 250000
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+def make_delta(source, target):
+    # Line-level edits that turn source into target, as [start, end, replacement] against the
+    # lines of source. Equal runs are not stored. Lines shared at both ends are trimmed first, so
+    # an edit to a long note only diffs the lines around it; a middle too large to diff quickly,
+    # which SequenceMatcher does in up to quadratic time, is replaced whole.
+    source_lines = source.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    shortest = min(len(source_lines), len(target_lines))
+    start = 0
+    while start < shortest and source_lines[start] == target_lines[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and source_lines[-1 - end] == target_lines[-1 - end]:
+        end += 1
+    source_lines = source_lines[start:len(source_lines) - end]
+    target_lines = target_lines[start:len(target_lines) - end]
+    if not source_lines and not target_lines:
+        return []
+    if len(source_lines) * len(target_lines) > DELTA_MAX_LINE_PAIRS:
+        return [[start, start + len(source_lines), ''.join(target_lines)]]
+    matcher = difflib.SequenceMatcher(None, source_lines, target_lines, autojunk=False)
+    return [[start + i1, start + i2, ''.join(target_lines[j1:j2])]
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+def apply_delta(source, delta):
+    lines = source.splitlines(keepends=True)
+    for start, end, replacement in reversed(delta):
+        lines[start:end] = replacement.splitlines(keepends=True)
+    return ''.join(lines)
+
+class Revision:
+    __slots__ = ('rev', 'time', 'title', 'offset', 'length', 'keyframe', 'base')
+
+    def __init__(self, rev, time, title, offset, length, keyframe, base):
+        self.rev = rev
+        self.time = time
+        self.title = title
+        self.offset = offset
+        self.length = length
+        self.keyframe = keyframe
+        self.base = base
+
+class HistoryStore:
+    # Earlier versions of edited notes, appended to <notebook>.history as json lines keyed by
+    # note id. Each record holds a delta that turns the version after it back into the version
+    # it stores, so an edit writes about as much as it changed and the current text lives only
+    # in the notebook. Every KEYFRAME_INTERVAL records, or when a delta would not be smaller,
+    # the full text is stored instead, which bounds how many deltas a lookup has to apply.
+    def __init__(self, filename, max_revisions=HISTORY_MAX_REVISIONS):
+        self.path = filename + '.history'
+        self.max_revisions = max_revisions
+        self.lock = threading.Lock()
+        self.index = None
+        self.file = open(self.path, 'ab')
+        self.reader = open(self.path, 'rb')
+
+    def load_index(self):
+        # Built the first time history is needed, not at startup.
+        if self.index is not None:
+            return self.index
+        self.index = {}
+        offset = 0
+        self.reader.seek(0)
+        for line in self.reader:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn last line from an interrupted write.
+                self.file.truncate(offset)
+                break
+            self.add_to_index(record, offset, len(line))
+            offset += len(line)
+        return self.index
+
+    def add_to_index(self, record, offset, length):
+        revision = Revision(record['rev'], record['time'], record['title'], offset, length, 'text' in record, record['base'])
+        self.index.setdefault(record['id'], []).append(revision)
+
+    def record(self, note_id, old_title, old_content, new_content):
+        with self.lock:
+            revisions = self.load_index().get(note_id, [])
+            rev = revisions[-1].rev + 1 if revisions else 0
+            record = {"id": note_id, "rev": rev, "time": time.time(), "title": old_title, "base": text_hash(new_content)}
+            since_keyframe = 0
+            for revision in reversed(revisions):
+                if revision.keyframe:
+                    break
+                since_keyframe += 1
+            delta = make_delta(new_content, old_content) if since_keyframe < KEYFRAME_INTERVAL - 1 else None
+            if delta is None or sum(len(replacement) for _, _, replacement in delta) >= len(old_content):
+                record["text"] = old_content
+            else:
+                record["delta"] = delta
+            line = (json.dumps(record) + '\n').encode('utf-8')
+            offset = self.file.seek(0, os.SEEK_END)
+            self.file.write(line)
+            self.file.flush()
+            self.add_to_index(record, offset, len(line))
+
+    def revisions(self, note_id):
+        with self.lock:
+            return list(reversed(self.load_index().get(note_id, [])))
+
+    def read_record(self, revision):
+        self.reader.seek(revision.offset)
+        return json.loads(self.reader.read(revision.length))
+
+    def text(self, note_id, current_content, rev):
+        # Start from the closest keyframe at or after rev, or from the current text, and apply
+        # deltas backwards. A record whose base does not match was made from an edit that never
+        # reached the notebook; it is skipped on the way down.
+        with self.lock:
+            revisions = self.load_index().get(note_id, [])
+            position = next(i for i, revision in enumerate(revisions) if revision.rev == rev)
+            start = next((i for i in range(position, len(revisions)) if revisions[i].keyframe), None)
+            if start is None:
+                text = current_content
+                start = len(revisions)
+            else:
+                text = self.read_record(revisions[start])['text']
+            for i in range(start - 1, position - 1, -1):
+                if revisions[i].base != text_hash(text):
+                    if i == position:
+                        raise ValueError(f"revision {rev} was made from an edit that was never saved")
+                    continue
+                record = self.read_record(revisions[i])
+                text = record['text'] if 'text' in record else apply_delta(text, record['delta'])
+            return revisions[position].title, text
+
+    def compact(self, live_ids, force=False):
+        # Drops the history of deleted notes and all but the newest max_revisions of each note.
+        # Dropping the oldest records never breaks the chain back from the current text. A small
+        # file returns before the index is read, so closing the app stays cheap.
+        with self.lock:
+            size = self.file.seek(0, os.SEEK_END)
+            if not force and size < HISTORY_COMPACT_BYTES:
+                return
+            index = self.load_index()
+            live_ids = set(live_ids)
+            keep = []
+            for note_id, revisions in index.items():
+                if note_id in live_ids:
+                    keep.extend(revisions[-self.max_revisions:])
+            kept_bytes = sum(revision.length for revision in keep)
+            if not force and size - kept_bytes < size // 4:
+                return
+            keep.sort(key=lambda revision: revision.offset)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                for revision in keep:
+                    self.reader.seek(revision.offset)
+                    f.write(self.reader.read(revision.length))
+                f.flush()
+                os.fsync(f.fileno())
+            self.file.close()
+            self.reader.close()
+            os.replace(tmp_path, self.path)
+            self.file = open(self.path, 'ab')
+            self.reader = open(self.path, 'rb')
+            self.index = None
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+            self.reader.close()
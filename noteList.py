@@ -0,0 +1,715 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+from array import array
+from contextlib import contextmanager
+from perfStats import timed
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+PACK_MAGIC = b'NPXPACK1\n'
+
+def new_note_id():
+    return os.urandom(8).hex()
+
+def legacy_note_id(index, title):
+    # For files saved before notes had ids, so every process opening one agrees on them.
+    return hashlib.blake2b(f"{index}\0{title}".encode('utf-8'), digest_size=8).hexdigest()
+
+def write_atomic(filename, data):
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_filename, filename)
+
+@contextmanager
+def file_lock(filename):
+    # Advisory lock on <filename>.lock, held by every process writing the notebook through
+    # NoteList. It does not stop other programs from writing the file.
+    with open(filename + '.lock', 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def lock_journal(filename):
+    # Exclusive lock on <filename>.journal.lock for as long as the returned file stays open.
+    # Raises NotebookInUse instead of waiting when another process holds it.
+    f = open(filename + '.journal.lock', 'a+b')
+    try:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        raise NotebookInUse(filename)
+    return f
+
+def file_stamp(filename):
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class NotebookChanged(Exception):
+    # Raised instead of overwriting a notebook another process saved since it was last read.
+    def __init__(self, filename):
+        super().__init__(f"{filename} was changed by another program")
+        self.filename = filename
+
+class NotebookInUse(Exception):
+    # Raised when another process is already writing the notebook's journal.
+    def __init__(self, filename):
+        super().__init__(f"{filename} is open for writing in another program")
+        self.filename = filename
+
+class NotePack:
+    # A .pack notebook is a magic line, one json line indexing [title, locked, offset, length, id]
+    # for every note, then the utf-8 bodies back to back. Only the index is parsed on load.
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        if self.file.readline() != PACK_MAGIC:
+            self.file.close()
+            raise ValueError(f"{filename} is not a note pack")
+        self.header = json.loads(self.file.readline())
+        self.base = self.file.tell()
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, offset, length):
+        start = self.base + offset
+        return self.mm[start:start + length]
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+class PackedContent:
+    __slots__ = ('pack', 'offset', 'length')
+
+    def __init__(self, pack, offset, length):
+        self.pack = pack
+        self.offset = offset
+        self.length = length
+
+    def read_bytes(self):
+        return self.pack.read(self.offset, self.length)
+
+    def read(self):
+        return self.read_bytes().decode('utf-8')
+
+class Note:
+    __slots__ = ('title', '_content', 'locked', 'id')
+
+    def __init__(self, title, content, locked=False, id=None):
+        self.title = title
+        self.content = content
+        self.locked = locked
+        # Stays the same across edits, saves and formats, unlike the note's position.
+        self.id = id or new_note_id()
+
+    @property
+    def content(self):
+        if isinstance(self._content, str):
+            return self._content
+        return self._content.read()
+
+    @content.setter
+    def content(self, content):
+        self._content = content
+
+    def to_dict(self):
+        return {"title": self.title, "content": self.content, "locked": self.locked, "id": self.id}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['title'], data['content'], data.get('locked', False), data.get('id'))
+
+class NoteView:
+    # A Note-like handle onto one row of a NoteColumns store; reads and writes go to the columns.
+    # Views of the same note compare and hash equal by id, so indexes can key notes by view, and
+    # a view kept in an index follows its note when deletions shift the rows.
+    __slots__ = ('columns', 'id', 'hint')
+
+    def __init__(self, columns, row):
+        self.columns = columns
+        self.id = columns.ids[row]
+        self.hint = row
+
+    def __eq__(self, other):
+        return isinstance(other, NoteView) and other.columns is self.columns and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    @property
+    def row(self):
+        if self.hint >= len(self.columns) or self.columns.ids[self.hint] != self.id:
+            self.hint = self.columns.row_of(self.id)
+        return self.hint
+
+    @property
+    def title(self):
+        return self.columns.titles[self.row]
+
+    @title.setter
+    def title(self, title):
+        self.columns.titles[self.row] = title
+
+    @property
+    def locked(self):
+        return bool(self.columns.locked[self.row])
+
+    @locked.setter
+    def locked(self, locked):
+        self.columns.locked[self.row] = bool(locked)
+
+    @property
+    def _content(self):
+        content = self.columns.contents[self.row]
+        if content is None:
+            return PackedContent(self.columns.pack, self.columns.offsets[self.row], self.columns.lengths[self.row])
+        return content
+
+    @property
+    def content(self):
+        content = self._content
+        if isinstance(content, str):
+            return content
+        return content.read()
+
+    @content.setter
+    def content(self, content):
+        self.columns.set_content(self.row, content)
+
+    def to_dict(self):
+        return {"title": self.title, "content": self.content, "locked": self.locked, "id": self.id}
+
+class NoteColumns:
+    # Titles, locked flags and content references kept column-wise. Bodies that live in a
+    # .pack file are stored as offset/length pairs in packed arrays instead of objects.
+    def __init__(self, notes=()):
+        self.titles = []
+        self.ids = []
+        self.locked = bytearray()
+        self.contents = []
+        self.offsets = array('q')
+        self.lengths = array('q')
+        self.pack = None
+        # Row of each id, built on first use and dropped when a deletion shifts the rows.
+        self.rows = None
+        for note in notes:
+            self.append(note)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [NoteView(self, row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("note index out of range")
+        return NoteView(self, index)
+
+    def __delitem__(self, index):
+        self.rows = None
+        del self.titles[index]
+        del self.ids[index]
+        del self.locked[index]
+        del self.contents[index]
+        del self.offsets[index]
+        del self.lengths[index]
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield NoteView(self, row)
+
+    def row_of(self, note_id):
+        if self.rows is None:
+            self.rows = {note_id: row for row, note_id in enumerate(self.ids)}
+        return self.rows[note_id]
+
+    def index(self, note):
+        try:
+            return self.row_of(note.id)
+        except KeyError:
+            raise ValueError("note is not in the collection") from None
+
+    def append(self, note):
+        if self.rows is not None:
+            self.rows[note.id] = len(self)
+        self.titles.append(note.title)
+        self.ids.append(note.id)
+        self.locked.append(bool(note.locked))
+        self.contents.append(None)
+        self.offsets.append(0)
+        self.lengths.append(0)
+        self.set_content(len(self) - 1, note._content)
+
+    def extend(self, notes):
+        for note in notes:
+            self.append(note)
+
+    def set_content(self, row, content):
+        if isinstance(content, PackedContent):
+            self.pack = content.pack
+            self.contents[row] = None
+            self.offsets[row] = content.offset
+            self.lengths[row] = content.length
+        else:
+            self.contents[row] = content
+
+class NoteJournal:
+    # Every change is appended as one json line tagged with a sequence number. The snapshot
+    # stores the last sequence number it contains, so replay skips records already folded in.
+    # Records refer to notes by index, so only one process may write the journal at a time: it
+    # holds <journal>.lock while open, and anything appended before it took the lock is replayed
+    # first so its sequence numbers carry on from the file's.
+    def __init__(self, note_list, filename, compact_threshold=JOURNAL_COMPACT_BYTES, held=None):
+        self.note_list = note_list
+        self.filename = filename
+        self.path = filename + '.journal'
+        self.old_path = self.path + '.old'
+        self.compact_threshold = compact_threshold
+        self.lock = threading.Lock()
+        self.compactor = None
+        self.held = held or lock_journal(filename)
+        NoteJournal.replay(note_list, filename)
+        self.file = open(self.path, 'a')
+        if os.path.exists(self.old_path):
+            self.compact()
+
+    @staticmethod
+    def replay(note_list, filename):
+        replayed = False
+        path = filename + '.journal'
+        for journal_path in (path + '.old', path):
+            if not os.path.exists(journal_path):
+                continue
+            good_end = 0
+            with open(journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    good_end += len(line)
+                    if record['seq'] > note_list.journal_seq:
+                        NoteJournal.apply(note_list.notes, record)
+                        note_list.journal_seq = record['seq']
+                        replayed = True
+            if journal_path == path and good_end < os.path.getsize(path):
+                os.truncate(path, good_end)
+        return replayed
+
+    @staticmethod
+    def apply(notes, record):
+        op = record['op']
+        if op == 'add':
+            note = record['note']
+            notes.append(Note.from_dict(note))
+        elif op == 'add_many':
+            notes.extend(Note.from_dict(note) for note in record['notes'])
+        elif op == 'remove':
+            del notes[record['index']]
+        elif op == 'update':
+            note = notes[record['index']]
+            for field in ('title', 'content', 'locked'):
+                if field in record:
+                    setattr(note, field, record[field])
+
+    def append(self, record):
+        with self.lock:
+            record['seq'] = self.note_list.journal_seq
+            self.file.write(json.dumps(record) + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            size = self.file.tell()
+        if size >= self.compact_threshold:
+            self.compact()
+
+    def compact(self):
+        with self.lock:
+            if self.compactor is not None and self.compactor.is_alive():
+                return
+            data = self.note_list.snapshot()
+            if not os.path.exists(self.old_path):
+                self.file.close()
+                os.replace(self.path, self.old_path)
+                self.file = open(self.path, 'a')
+            self.compactor = threading.Thread(target=self.write_snapshot, args=(data,), daemon=True)
+            self.compactor.start()
+
+    def write_snapshot(self, data):
+        with file_lock(self.filename):
+            write_atomic(self.filename, json.dumps(data))
+        os.remove(self.old_path)
+
+    def close(self):
+        if self.compactor is not None:
+            self.compactor.join()
+        with self.lock:
+            self.file.close()
+        self.held.close()
+
+class JsonSave:
+    # A save is prepared on the GUI thread, written on any thread, then finished on the GUI thread.
+    def __init__(self, backend, data):
+        self.backend = backend
+        self.filename = backend.filename
+        self.data = data
+        self.expected = backend.stamp
+        self.stamp = None
+
+    def write(self):
+        with file_lock(self.filename):
+            if self.expected is not None and file_stamp(self.filename) != self.expected:
+                raise NotebookChanged(self.filename)
+            write_atomic(self.filename, json.dumps(self.data))
+            self.stamp = file_stamp(self.filename)
+
+    def finish(self):
+        self.backend.set_base(self.data['notes'], self.stamp)
+
+class PackSave:
+    def __init__(self, note_list, filename):
+        self.note_list = note_list
+        self.filename = filename
+        self.tmp_filename = filename + '.tmp'
+        self.journal_seq = note_list.journal_seq
+        self.notes = [(note, note.title, note.locked, note._content, note.id) for note in note_list.notes]
+        self.entries = []
+
+    def write(self):
+        bodies = []
+        offset = 0
+        for note, title, locked, content, note_id in self.notes:
+            if isinstance(content, PackedContent):
+                body = content
+            else:
+                body = (content if isinstance(content, str) else content.read()).encode('utf-8')
+            length = body.length if isinstance(body, PackedContent) else len(body)
+            self.entries.append([title, locked, offset, length, note_id])
+            bodies.append(body)
+            offset += length
+        with open(self.tmp_filename, 'wb') as f:
+            f.write(PACK_MAGIC)
+            f.write(json.dumps({"journal_seq": self.journal_seq, "notes": self.entries}).encode('ascii') + b'\n')
+            for body in bodies:
+                f.write(body.read_bytes() if isinstance(body, PackedContent) else body)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def finish(self):
+        # The old map has to be released before the rename on Windows.
+        self.note_list.close_pack()
+        with file_lock(self.filename):
+            os.replace(self.tmp_filename, self.filename)
+        pack = self.note_list.pack = NotePack(self.filename)
+        for (note, _, _, content, _), (_, _, offset, length, _) in zip(self.notes, self.entries):
+            # Bodies edited since prepare stay in memory until the next save picks them up.
+            current = note._content
+            if current is content or isinstance(current, PackedContent):
+                note.content = PackedContent(pack, offset, length)
+
+class JsonBackend:
+    # Storage backends load a notebook into a NoteList, see every change through record() and
+    # write saves. This one keeps the whole notebook in one json file that every save rewrites.
+    # merges is True for backends that can merge in what another process saved, through merge().
+    writes_through = False
+    merges = True
+
+    def __init__(self, filename):
+        self.filename = filename
+        # The notes as last read from or written to the file, by id, and the file's mtime and
+        # size at that point. Used to find changes saved by other processes.
+        self.base = {}
+        self.stamp = None
+
+    def read(self):
+        with file_lock(self.filename):
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+            stamp = file_stamp(self.filename)
+        for index, note in enumerate(data['notes']):
+            if 'id' not in note:
+                note['id'] = legacy_note_id(index, note['title'])
+        return data, stamp
+
+    def load(self, note_list):
+        data, stamp = self.read()
+        note_list.notes = note_list.new_store(Note.from_dict(note) for note in data['notes'])
+        note_list.journal_seq = data.get('journal_seq', 0)
+        if NoteJournal.replay(note_list, self.filename):
+            # The file alone no longer matches the notes, so a merge would see phantom changes.
+            self.set_base([], None)
+        else:
+            self.set_base(data['notes'], stamp)
+
+    def set_base(self, notes, stamp):
+        self.base = {note['id']: note for note in notes}
+        self.stamp = stamp
+
+    def changed_on_disk(self):
+        return self.stamp is not None and file_stamp(self.filename) != self.stamp
+
+    def merge(self, note_list):
+        # Reads what another process saved and works out which notes it added, changed or
+        # removed. The caller applies the merge, then the file becomes the new base.
+        data, stamp = self.read()
+        merge = NotebookMerge(self.base, note_list.notes, data['notes'])
+        self.set_base(data['notes'], stamp)
+        return merge
+
+    def record(self, note_list, record):
+        pass
+
+    def prepare_save(self, note_list):
+        return JsonSave(self, note_list.snapshot())
+
+    def open_search_index(self, note_list):
+        from noteSearch import SearchIndex
+        return SearchIndex.open(self.filename + '.search', note_list)
+
+    def close(self):
+        pass
+
+class PackBackend(JsonBackend):
+    merges = False
+
+    def load(self, note_list):
+        note_list.load_pack(self.filename)
+        NoteJournal.replay(note_list, self.filename)
+
+    def prepare_save(self, note_list):
+        return PackSave(note_list, self.filename)
+
+def sqlite_backend(filename):
+    from noteSqlite import SqliteBackend
+    return SqliteBackend(filename)
+
+def blob_backend(filename):
+    from blobStore import BlobBackend
+    return BlobBackend(filename)
+
+BACKENDS = {'.pack': PackBackend, '.store': blob_backend, '.db': sqlite_backend, '.sqlite': sqlite_backend}
+
+def open_backend(filename):
+    for suffix, backend in BACKENDS.items():
+        if filename.endswith(suffix):
+            return backend(filename)
+    return JsonBackend(filename)
+
+def same_note(note, fields):
+    return note.title == fields['title'] and note.locked == fields.get('locked', False) and note.content == fields['content']
+
+class NotebookMerge:
+    # Three-way diff by note id between the base (the file as this process last saw it), the
+    # notes in memory and the file as it is now. Changes made only on disk become updates,
+    # removes and adds; notes changed on both sides, differently, become conflicts. A conflict
+    # is (index, fields) where either side is None when that side deleted the note.
+    def __init__(self, base, notes, theirs):
+        self.updates = []
+        self.removes = []
+        self.adds = []
+        self.conflicts = []
+        mine = {note.id: index for index, note in enumerate(notes)}
+        their_ids = set()
+        for fields in theirs:
+            fields.setdefault('locked', False)
+            note_id = fields['id']
+            their_ids.add(note_id)
+            old = base.get(note_id)
+            if old is not None and old['title'] == fields['title'] and old.get('locked', False) == fields['locked'] and old['content'] == fields['content']:
+                continue
+            index = mine.get(note_id)
+            if index is None:
+                if old is None:
+                    self.adds.append(Note.from_dict(fields))
+                else:
+                    self.conflicts.append((None, fields))
+            elif old is None or not same_note(notes[index], old):
+                if not same_note(notes[index], fields):
+                    self.conflicts.append((index, fields))
+            else:
+                self.updates.append((index, fields['title'], fields['content'], fields['locked']))
+        for note_id, old in base.items():
+            index = mine.get(note_id)
+            if note_id in their_ids or index is None:
+                continue
+            if same_note(notes[index], old):
+                self.removes.append(index)
+            else:
+                self.conflicts.append((index, None))
+        # Highest first so earlier removals do not shift the later indexes.
+        self.removes.sort(reverse=True)
+
+    def __bool__(self):
+        return bool(self.updates or self.removes or self.adds or self.conflicts)
+
+class NoteList:
+    def __init__(self):
+        self.notes = self.new_store([])
+        self.journal = None
+        self.journal_seq = 0
+        self.pack = None
+        self.backend = None
+        self.history = None
+        self.listeners = []
+
+    def new_store(self, notes):
+        return list(notes)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def record(self, record):
+        # journal_seq counts every change, journaled or not, so anything saved alongside
+        # the notebook can tell whether it is still current.
+        self.journal_seq += 1
+        if self.backend:
+            self.backend.record(self, record)
+        if self.journal:
+            self.journal.append(record)
+
+    def add_note(self, note):
+        self.notes.append(note)
+        self.record({"op": "add", "note": note.to_dict()})
+        for listener in self.listeners:
+            listener.note_added(note)
+
+    def add_notes(self, notes):
+        self.notes.extend(notes)
+        self.record({"op": "add_many", "notes": [note.to_dict() for note in notes]})
+        for note in notes:
+            for listener in self.listeners:
+                listener.note_added(note)
+
+    def remove_note(self, index):
+        note = self.notes[index]
+        del self.notes[index]
+        self.record({"op": "remove", "index": index})
+        for listener in self.listeners:
+            listener.note_removed(note)
+
+    def edit_note(self, index, title, content):
+        note = self.notes[index]
+        if self.history is not None:
+            old_content = note.content
+            if title != note.title or content != old_content:
+                self.history.record(note.id, note.title, old_content, content)
+        note.title = title
+        note.content = content
+        self.record({"op": "update", "index": index, "title": title, "content": content})
+        for listener in self.listeners:
+            listener.note_changed(note)
+
+    def set_locked(self, index, locked):
+        self.notes[index].locked = locked
+        self.record({"op": "update", "index": index, "locked": locked})
+
+    def snapshot(self):
+        return {"notes": [note.to_dict() for note in self.notes], "journal_seq": self.journal_seq}
+
+    def writes_through(self):
+        # True when every change is already on disk, so there is nothing for save_notes to do.
+        return self.journal is not None or (self.backend is not None and self.backend.writes_through)
+
+    def prepare_save(self, filename):
+        if self.backend and self.backend.filename == filename:
+            return self.backend.prepare_save(self)
+        backend = open_backend(filename)
+        save = backend.prepare_save(self)
+        backend.close()
+        return save
+
+    @timed('save_notes')
+    def save_notes(self, filename):
+        save = self.prepare_save(filename)
+        save.write()
+        save.finish()
+
+    @timed('load_notes')
+    def load_notes(self, filename):
+        self.close_backend()
+        self.backend = open_backend(filename)
+        self.backend.load(self)
+
+    def close_backend(self):
+        if self.backend:
+            self.backend.close()
+            self.backend = None
+
+    def open_search_index(self):
+        if self.backend:
+            return self.backend.open_search_index(self)
+        from noteSearch import SearchIndex
+        return SearchIndex.build(self)
+
+    def load_pack(self, filename):
+        self.close_pack()
+        self.pack = NotePack(filename)
+        # Packs written before notes had ids have four fields per entry.
+        self.notes = self.new_store(Note(entry[0], PackedContent(self.pack, entry[2], entry[3]), entry[1], entry[4] if len(entry) > 4 else None)
+                                    for entry in self.pack.header['notes'])
+        self.journal_seq = self.pack.header.get('journal_seq', 0)
+
+    def close_pack(self):
+        if self.pack:
+            self.pack.close()
+            self.pack = None
+
+    def open_journal(self, filename, compact_threshold=JOURNAL_COMPACT_BYTES, held=None):
+        # held is the journal lock if the caller took it before loading the notes.
+        self.journal = NoteJournal(self, filename, compact_threshold, held)
+
+    def close_journal(self):
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+    def open_history(self, filename, max_revisions=None):
+        from noteHistory import HistoryStore, HISTORY_MAX_REVISIONS
+        self.history = HistoryStore(filename, max_revisions or HISTORY_MAX_REVISIONS)
+
+    def close_history(self):
+        if self.history:
+            self.history.compact(note.id for note in self.notes)
+            self.history.close()
+            self.history = None
+
+    def close(self):
+        self.close_history()
+        self.close_journal()
+        self.close_pack()
+        self.close_backend()
+
+class CompactNoteList(NoteList):
+    # NoteList backed by NoteColumns, for collections too large for one object per note.
+    def new_store(self, notes):
+        return NoteColumns(notes)
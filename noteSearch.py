@@ -0,0 +1,254 @@
+import bisect
+import heapq
+import marshal
+import math
+import os
+import re
+from collections import OrderedDict
+from noteList import file_stamp
+
+TOKEN_RE = re.compile(r'\w+')
+TITLE_WEIGHT = 3
+INDEX_MAGIC = b'NPXSEARCH2\n'
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+def notebook_stamps(filename):
+    # The notebook a <notebook>.search file belongs to, and its journal, as they are on disk now.
+    notebook = os.path.splitext(filename)[0]
+    return [file_stamp(notebook), file_stamp(notebook + '.journal')]
+
+def parse_query(query):
+    # Terms ending in * are prefixes, and so is the last term while it is still being typed.
+    chunks = query.split()
+    terms = []
+    for position, chunk in enumerate(chunks):
+        prefix = chunk.endswith('*') or (position == len(chunks) - 1 and not query[-1:].isspace())
+        tokens = tokenize(chunk)
+        for token in tokens[:-1]:
+            terms.append((token, False))
+        if tokens:
+            terms.append((tokens[-1], prefix))
+    return terms
+
+class SearchIndex:
+    # Inverted index over note titles and bodies. Postings are keyed by small integer doc ids
+    # rather than by notes so the whole index can be saved and loaded without rebuilding. It is
+    # saved with marshal, which only reads back plain data, under a versioned header; a saved
+    # index is used only if the notebook files still have the mtime and size they had then.
+    def __init__(self):
+        self.postings = {}
+        self.doc_tokens = {}
+        self.vocabulary = []
+        self.docs = {}
+        self.doc_ids = {}
+        self.next_doc = 0
+
+    @classmethod
+    def open(cls, filename, note_list):
+        try:
+            with open(filename, 'rb') as f:
+                raw = f.read()
+            data = marshal.loads(raw[len(INDEX_MAGIC):]) if raw.startswith(INDEX_MAGIC) else None
+        except (OSError, EOFError, ValueError, TypeError):
+            data = None
+        if (isinstance(data, dict) and data.get('stamps') == notebook_stamps(filename)
+                and data.get('journal_seq') == note_list.journal_seq and len(data['rows']) == len(note_list.notes)):
+            index = cls()
+            index.postings = data['postings']
+            index.doc_tokens = data['doc_tokens']
+            index.vocabulary = data['vocabulary']
+            index.next_doc = data['next_doc']
+            for doc, note in zip(data['rows'], note_list.notes):
+                index.docs[doc] = note
+                index.doc_ids[note] = doc
+            return index
+        return cls.build(note_list)
+
+    @classmethod
+    def build(cls, note_list):
+        index = cls()
+        for note in note_list.notes:
+            index.add(note)
+        return index
+
+    def save(self, filename, note_list):
+        data = {
+            "stamps": notebook_stamps(filename),
+            "journal_seq": note_list.journal_seq,
+            "rows": [self.doc_ids[note] for note in note_list.notes],
+            "postings": self.postings,
+            "doc_tokens": self.doc_tokens,
+            "vocabulary": self.vocabulary,
+            "next_doc": self.next_doc,
+        }
+        tmp_filename = filename + '.tmp'
+        with open(tmp_filename, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            marshal.dump(data, f)
+        os.replace(tmp_filename, filename)
+
+    def weigh(self, note):
+        weights = {}
+        for token in tokenize(note.title):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(note.content):
+            weights[token] = weights.get(token, 0) + 1
+        return weights
+
+    def add(self, note):
+        doc = self.next_doc
+        self.next_doc += 1
+        self.docs[doc] = note
+        self.doc_ids[note] = doc
+        weights = self.weigh(note)
+        self.doc_tokens[doc] = tuple(weights)
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                bisect.insort(self.vocabulary, token)
+            posting[doc] = weight
+
+    def remove(self, note):
+        doc = self.doc_ids.pop(note)
+        del self.docs[doc]
+        for token in self.doc_tokens.pop(doc):
+            posting = self.postings[token]
+            del posting[doc]
+            if not posting:
+                del self.postings[token]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def note_added(self, note):
+        self.add(note)
+
+    def note_removed(self, note):
+        self.remove(note)
+
+    def note_changed(self, note):
+        self.remove(note)
+        self.add(note)
+
+    def expand(self, prefix):
+        # Every token starting with prefix, the same set FTS5 matches for prefix*.
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + '\U0010ffff', start)
+        return self.vocabulary[start:end]
+
+    def search(self, query, limit=None):
+        term_postings = []
+        for token, prefix in parse_query(query):
+            tokens = self.expand(token) if prefix else [token] if token in self.postings else []
+            if not tokens:
+                return []
+            term_postings.append([self.postings[token] for token in tokens])
+        if not term_postings:
+            return []
+        term_postings.sort(key=lambda postings: sum(map(len, postings)))
+
+        total = len(self.docs)
+        scores = None
+        for postings in term_postings:
+            idf = math.log(1 + total / sum(map(len, postings)))
+            if scores is None:
+                # A short prefix can expand to many tokens; the largest posting is copied whole.
+                postings = sorted(postings, key=len, reverse=True)
+                weights = dict(postings[0])
+                for posting in postings[1:]:
+                    for doc, weight in posting.items():
+                        weights[doc] = weights.get(doc, 0) + weight
+                scores = {doc: (1 + math.log(weight)) * idf for doc, weight in weights.items()}
+                continue
+            matched = {}
+            for doc, score in scores.items():
+                weight = 0
+                for posting in postings:
+                    weight += posting.get(doc, 0)
+                if weight:
+                    matched[doc] = score + (1 + math.log(weight)) * idf
+            scores = matched
+
+        if limit is None:
+            ranked = sorted(scores, key=scores.get, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores, key=scores.get)
+        return [self.docs[doc] for doc in ranked]
+
+QUICK_OPEN_CANDIDATES = 200
+QUICK_OPEN_CACHE_SIZE = 64
+
+def trigrams(text, closed=True):
+    padded = '  ' + text.lower() + (' ' if closed else '')
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    # Fuzzy title matching: candidates are the notes sharing the most trigrams with the query,
+    # ranked by trigram overlap with a bonus for substring and prefix hits.
+    def __init__(self, notes=()):
+        self.postings = {}
+        self.note_trigrams = {}
+        self.cache = OrderedDict()
+        for note in notes:
+            self.add(note)
+
+    def add(self, note):
+        grams = trigrams(note.title)
+        self.note_trigrams[note] = (note.title.lower(), grams)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(note)
+        self.cache.clear()
+
+    def remove(self, note):
+        title, grams = self.note_trigrams.pop(note)
+        for gram in grams:
+            posting = self.postings[gram]
+            posting.discard(note)
+            if not posting:
+                del self.postings[gram]
+        self.cache.clear()
+
+    def note_added(self, note):
+        self.add(note)
+
+    def note_removed(self, note):
+        self.remove(note)
+
+    def note_changed(self, note):
+        if self.note_trigrams[note][0] != note.title.lower():
+            self.remove(note)
+            self.add(note)
+
+    def search(self, query, limit=20):
+        query = query.strip().lower()
+        if not query:
+            return []
+        key = (query, limit)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        query_grams = trigrams(query, closed=False)
+        shared = {}
+        for gram in query_grams:
+            for note in self.postings.get(gram, ()):
+                shared[note] = shared.get(note, 0) + 1
+        candidates = heapq.nlargest(QUICK_OPEN_CANDIDATES, shared, key=shared.get)
+
+        scored = []
+        for note in candidates:
+            title, grams = self.note_trigrams[note]
+            score = shared[note] / (len(query_grams) + len(grams) - shared[note])
+            position = title.find(query)
+            if position == 0:
+                score += 1
+            elif position > 0:
+                score += 0.5
+            scored.append((score, note))
+        results = [note for score, note in heapq.nlargest(limit, scored, key=lambda item: item[0])]
+
+        self.cache[key] = results
+        if len(self.cache) > QUICK_OPEN_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return results
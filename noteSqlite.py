@@ -0,0 +1,218 @@
+import sqlite3
+import threading
+from noteList import Note
+from noteSearch import parse_query, TITLE_WEIGHT
+
+LIST_PAGE_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    locked INTEGER NOT NULL DEFAULT 0,
+    uid TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, content, content='notes', content_rowid='id',
+    tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE OF title, content ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+"""
+
+def connect(filename):
+    connection = sqlite3.connect(filename, isolation_level=None, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')
+    # In WAL mode NORMAL can lose the last commits on power failure but never corrupts the file.
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(SCHEMA)
+    if 'uid' not in [row[1] for row in connection.execute('PRAGMA table_info(notes)')]:
+        connection.execute('ALTER TABLE notes ADD COLUMN uid TEXT')
+    return connection
+
+def fts_query(query):
+    # Same rules as SearchIndex: every term has to match and prefix terms get a trailing *.
+    return ' '.join(f'"{token}"*' if prefix else f'"{token}"' for token, prefix in parse_query(query))
+
+class SqliteContent:
+    __slots__ = ('backend', 'rowid')
+
+    def __init__(self, backend, rowid):
+        self.backend = backend
+        self.rowid = rowid
+
+    def read(self):
+        return self.backend.read_content(self.rowid)
+
+class NullSave:
+    # Every change was committed when it was made, so there is nothing left to write.
+    def write(self):
+        pass
+
+    def finish(self):
+        pass
+
+class SqliteSave:
+    # Writes a whole notebook into a database, replacing what it held. Used to migrate from
+    # the json and pack formats.
+    def __init__(self, note_list, filename):
+        self.filename = filename
+        self.journal_seq = note_list.journal_seq
+        self.notes = [(note.title, note._content, note.locked, note.id) for note in note_list.notes]
+
+    def write(self):
+        connection = connect(self.filename)
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('DELETE FROM notes')
+            connection.executemany('INSERT INTO notes (title, content, locked, uid) VALUES (?, ?, ?, ?)',
+                                   ((title, content if isinstance(content, str) else content.read(), int(locked), note_id)
+                                    for title, content, locked, note_id in self.notes))
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('journal_seq', ?)", (self.journal_seq,))
+            connection.execute('COMMIT')
+        finally:
+            connection.close()
+
+    def finish(self):
+        pass
+
+class SqliteSearchIndex:
+    # Full-text search through the notes_fts table. Triggers keep it in step with the notes
+    # table, so the listener methods have nothing to do.
+    def __init__(self, backend, note_list):
+        self.backend = backend
+        self.note_list = note_list
+
+    def note_added(self, note):
+        pass
+
+    def note_removed(self, note):
+        pass
+
+    def note_changed(self, note):
+        pass
+
+    def search(self, query, limit=None):
+        match = fts_query(query)
+        if not match:
+            return []
+        rows = self.backend.rows()
+        return [self.note_list.notes[rows[rowid]] for rowid in self.backend.search(match, limit) if rowid in rows]
+
+    def save(self, filename, note_list):
+        pass
+
+class SqliteBackend:
+    # Every change is its own transaction on one row, in a WAL-mode database. Loading reads
+    # titles and flags only; bodies are fetched when a note is opened.
+    writes_through = True
+    merges = False
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.connection = connect(filename)
+        self.lock = threading.Lock()
+        self.rowids = []
+        self.positions = None
+
+    def load(self, note_list):
+        self.rowids = []
+        self.positions = None
+        missing = []
+        note_list.notes = note_list.new_store(self.read_notes(missing))
+        note_list.journal_seq = self.get_meta('journal_seq', 0)
+        if missing:
+            # Rows written before notes had ids keep the ids they were just given.
+            with self.lock:
+                self.connection.execute('BEGIN IMMEDIATE')
+                self.connection.executemany('UPDATE notes SET uid = ? WHERE id = ?', missing)
+                self.connection.execute('COMMIT')
+
+    def read_notes(self, missing):
+        with self.lock:
+            cursor = self.connection.execute('SELECT id, title, locked, uid FROM notes ORDER BY id')
+            while True:
+                page = cursor.fetchmany(LIST_PAGE_SIZE)
+                if not page:
+                    break
+                for rowid, title, locked, uid in page:
+                    self.rowids.append(rowid)
+                    note = Note(title, SqliteContent(self, rowid), bool(locked), uid)
+                    if uid is None:
+                        missing.append((note.id, rowid))
+                    yield note
+
+    def read_content(self, rowid):
+        with self.lock:
+            row = self.connection.execute('SELECT content FROM notes WHERE id = ?', (rowid,)).fetchone()
+        if row is None:
+            raise KeyError(f"note {rowid} is not in {self.filename}")
+        return row[0]
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def record(self, note_list, record):
+        op = record['op']
+        added = []
+        with self.lock:
+            connection = self.connection
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                if op in ('add', 'add_many'):
+                    for note in [record['note']] if op == 'add' else record['notes']:
+                        cursor = connection.execute('INSERT INTO notes (title, content, locked, uid) VALUES (?, ?, ?, ?)',
+                                                    (note['title'], note['content'], int(note['locked']), note['id']))
+                        added.append(cursor.lastrowid)
+                elif op == 'remove':
+                    connection.execute('DELETE FROM notes WHERE id = ?', (self.rowids[record['index']],))
+                elif op == 'update':
+                    fields = [field for field in ('title', 'content', 'locked') if field in record]
+                    connection.execute(f"UPDATE notes SET {', '.join(field + ' = ?' for field in fields)} WHERE id = ?",
+                                       [record[field] for field in fields] + [self.rowids[record['index']]])
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('journal_seq', ?)", (note_list.journal_seq,))
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        if op == 'remove':
+            del self.rowids[record['index']]
+        self.rowids.extend(added)
+        if op != 'update':
+            self.positions = None
+
+    def rows(self):
+        if self.positions is None:
+            self.positions = {rowid: row for row, rowid in enumerate(self.rowids)}
+        return self.positions
+
+    def search(self, match, limit=None):
+        with self.lock:
+            cursor = self.connection.execute(
+                'SELECT rowid FROM notes_fts WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts, ?, 1.0) LIMIT ?',
+                (match, float(TITLE_WEIGHT), -1 if limit is None else limit))
+            return [row[0] for row in cursor]
+
+    def prepare_save(self, note_list):
+        if note_list.backend is self:
+            return NullSave()
+        return SqliteSave(note_list, self.filename)
+
+    def open_search_index(self, note_list):
+        return SqliteSearchIndex(self, note_list)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
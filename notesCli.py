@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import sys
+from noteList import Note, NoteList, NotebookChanged, NotebookInUse, lock_journal
+
+# Command-line access to the same notebook NoteApp uses, without importing Qt:
+#   python notesCli.py list
+#   python notesCli.py add "Title" < body.txt
+#   python notesCli.py search "some words"
+
+def open_notes(args, update=False):
+    # Reading replays the journal; writing appends to it, which needs its lock first so NoteApp
+    # or another command is not appending at the same time.
+    held = None
+    if update and os.path.exists(args.notes + '.journal'):
+        try:
+            held = lock_journal(args.notes)
+        except NotebookInUse as error:
+            sys.exit(f"notesCli: {error}, close it and run this again")
+    note_list = NoteList()
+    if os.path.exists(args.notes):
+        note_list.load_notes(args.notes)
+    if held is not None:
+        note_list.open_journal(args.notes, held=held)
+    return note_list
+
+def open_search_index(args, note_list):
+    search_index = note_list.open_search_index()
+    note_list.add_listener(search_index)
+    return search_index
+
+def open_for_update(args):
+    # Keep an existing search index current so NoteApp does not have to rebuild it.
+    note_list = open_notes(args, update=True)
+    search_index = None
+    if os.path.exists(args.notes + '.search'):
+        search_index = open_search_index(args, note_list)
+    return note_list, search_index
+
+def commit(args, note_list, search_index):
+    if not note_list.writes_through():
+        try:
+            note_list.save_notes(args.notes)
+        except NotebookChanged as error:
+            note_list.close()
+            sys.exit(f"notesCli: {error} while this command ran, nothing was saved; run it again")
+    if search_index is not None:
+        search_index.save(args.notes + '.search', note_list)
+    note_list.close()
+
+def check_index(note_list, index):
+    if not 0 <= index < len(note_list.notes):
+        note_list.close()
+        sys.exit(f"notesCli: no note at index {index}")
+
+def write_line(record):
+    sys.stdout.write(json.dumps(record) + '\n')
+
+def note_record(index, note, with_content):
+    record = {"index": index, "id": note.id, "title": note.title, "locked": note.locked}
+    if with_content:
+        record["content"] = note.content
+    return record
+
+def command_list(args):
+    note_list = open_notes(args)
+    for index, note in enumerate(note_list.notes):
+        if args.json:
+            write_line(note_record(index, note, args.content))
+        else:
+            sys.stdout.write(f"{index}\t{'[locked] ' if note.locked else ''}{note.title}\n")
+    note_list.close()
+
+def command_show(args):
+    note_list = open_notes(args)
+    check_index(note_list, args.index)
+    sys.stdout.write(note_list.notes[args.index].content)
+    note_list.close()
+
+def command_add(args):
+    content = args.content if args.content is not None else sys.stdin.read()
+    note_list, search_index = open_for_update(args)
+    note_list.add_note(Note(args.title, content, args.locked))
+    commit(args, note_list, search_index)
+
+def command_remove(args):
+    note_list, search_index = open_for_update(args)
+    check_index(note_list, args.index)
+    note_list.remove_note(args.index)
+    commit(args, note_list, search_index)
+
+def command_search(args):
+    note_list = open_notes(args)
+    search_index = open_search_index(args, note_list)
+    positions = {note.id: index for index, note in enumerate(note_list.notes)}
+    for note in search_index.search(args.query, args.limit):
+        index = positions[note.id]
+        if args.json:
+            write_line(note_record(index, note, args.content))
+        else:
+            sys.stdout.write(f"{index}\t{note.title}\n")
+    search_index.save(args.notes + '.search', note_list)
+    note_list.close()
+
+def command_export(args):
+    from bulkExport import BulkExport
+    if args.format != 'jsonl' and not args.output:
+        sys.exit(f"notesCli: --output is required for {args.format} exports")
+    note_list = open_notes(args)
+    entries = enumerate(note_list.notes)
+    if args.query:
+        search_index = open_search_index(args, note_list)
+        positions = {note.id: index for index, note in enumerate(note_list.notes)}
+        entries = [(positions[note.id], note) for note in search_index.search(args.query)]
+        search_index.save(args.notes + '.search', note_list)
+    exporter = BulkExport(entries, args.output or sys.stdout, args.format, args.workers)
+    progress = None
+    if args.output and not args.quiet:
+        progress = lambda done, total: sys.stderr.write(f"\r{done}/{total}")
+    written = exporter.run(progress)
+    if progress:
+        sys.stderr.write('\n')
+    for title, error in exporter.errors:
+        sys.stderr.write(f"skipped {title}: {error}\n")
+    if args.output:
+        sys.stderr.write(f"exported {written} note(s)\n")
+    note_list.close()
+
+def command_import(args):
+    from bulkImport import BulkImport, find_files
+    paths = find_files(args.paths, args.pattern)
+    importer = BulkImport(paths, args.title_from, args.workers, args.processes)
+    progress = None
+    if not args.quiet:
+        progress = lambda done, total: sys.stderr.write(f"\r{done}/{total}")
+    notes = importer.read(progress)
+    if progress:
+        sys.stderr.write('\n')
+    for path, error in importer.errors:
+        sys.stderr.write(f"skipped {path}: {error}\n")
+    note_list, search_index = open_for_update(args)
+    note_list.add_notes([Note(title, content) for title, content in notes])
+    commit(args, note_list, search_index)
+    sys.stderr.write(f"imported {len(notes)} note(s)\n")
+
+def command_convert(args):
+    if os.path.exists(args.target) and not args.force:
+        sys.exit(f"notesCli: {args.target} already exists, pass --force to replace its notes")
+    note_list = open_notes(args)
+    note_list.save_notes(args.target)
+    sys.stderr.write(f"copied {len(note_list.notes)} note(s) to {args.target}\n")
+    note_list.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='notesCli', description="Work with a NotepadExpanded notebook from the command line.")
+    parser.add_argument('--notes', default='notes.json', help="notebook file (.json, .pack or .db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help="list note titles")
+    list_parser.add_argument('--json', action='store_true', help="write one json object per line")
+    list_parser.add_argument('--content', action='store_true', help="include note bodies in --json output")
+    list_parser.set_defaults(func=command_list)
+
+    show_parser = commands.add_parser('show', help="print a note body")
+    show_parser.add_argument('index', type=int)
+    show_parser.set_defaults(func=command_show)
+
+    add_parser = commands.add_parser('add', help="add a note, reading the body from stdin unless --content is given")
+    add_parser.add_argument('title')
+    add_parser.add_argument('--content')
+    add_parser.add_argument('--locked', action='store_true')
+    add_parser.set_defaults(func=command_add)
+
+    remove_parser = commands.add_parser('remove', help="delete a note")
+    remove_parser.add_argument('index', type=int)
+    remove_parser.set_defaults(func=command_remove)
+
+    search_parser = commands.add_parser('search', help="full-text search")
+    search_parser.add_argument('query')
+    search_parser.add_argument('--limit', type=int, default=None)
+    search_parser.add_argument('--json', action='store_true')
+    search_parser.add_argument('--content', action='store_true')
+    search_parser.set_defaults(func=command_search)
+
+    export_parser = commands.add_parser('export', help="write every note, or the notes matching --query, as json lines, .txt files or a zip")
+    export_parser.add_argument('--output', '-o', help="file to write instead of stdout; a directory for --format txt")
+    export_parser.add_argument('--format', choices=['jsonl', 'txt', 'zip'], default='jsonl')
+    export_parser.add_argument('--query', help="export only notes matching this search")
+    export_parser.add_argument('--workers', type=int, default=None)
+    export_parser.add_argument('--quiet', '-q', action='store_true')
+    export_parser.set_defaults(func=command_export)
+
+    import_parser = commands.add_parser('import', help="import text files from directories or globs")
+    import_parser.add_argument('paths', nargs='+')
+    import_parser.add_argument('--pattern', default='*.txt', help="file pattern used inside directories")
+    import_parser.add_argument('--title-from', choices=['filename', 'first_line'], default='filename')
+    import_parser.add_argument('--workers', type=int, default=None)
+    import_parser.add_argument('--processes', action='store_true', help="read files in a process pool")
+    import_parser.add_argument('--quiet', '-q', action='store_true')
+    import_parser.set_defaults(func=command_import)
+
+    convert_parser = commands.add_parser('convert', help="copy the notebook into another format, e.g. notes.db")
+    convert_parser.add_argument('target')
+    convert_parser.add_argument('--force', action='store_true')
+    convert_parser.set_defaults(func=command_convert)
+
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        # Output was piped into something like head that stopped reading.
+        sys.stderr.close()
+
+if __name__ == '__main__':
+    main()
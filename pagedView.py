@@ -0,0 +1,217 @@
+import mmap
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPlainTextEdit, QScrollBar
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QTextCursor
+
+WINDOW_BYTES = 256 * 1024
+SCROLL_UNIT = 1024
+
+class BytesSource:
+    # Utf-8 text held as bytes, or as an mmap in MappedSource. Searches run on the bytes directly.
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+
+    def read(self, offset, length):
+        return self.data[offset:offset + length]
+
+    def line_start(self, offset):
+        if offset <= 0:
+            return 0
+        return self.data.rfind(b'\n', max(0, offset - WINDOW_BYTES), offset) + 1
+
+    def find(self, needle, start):
+        return self.data.find(needle, start)
+
+    def rfind(self, needle, end):
+        return self.data.rfind(needle, 0, end)
+
+    def replace(self, start, end, data):
+        # The first edit turns the bytes into a bytearray; later ones only move the tail.
+        if not isinstance(self.data, bytearray):
+            self.data = bytearray(self.data)
+        self.data[start:end] = data
+        self.size = len(self.data)
+
+    def close(self):
+        pass
+
+class MappedSource(BytesSource):
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        super().__init__(mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+def utf16_length(text):
+    return len(text.encode('utf-16-le')) // 2
+
+def utf16_prefix(text, units):
+    # The start of text that is units UTF-16 code units long; Qt counts cursor positions in these.
+    return text.encode('utf-16-le')[:units * 2].decode('utf-16-le', 'ignore')
+
+def char_boundary(data, end):
+    # Backs end up to the start of a utf-8 sequence so a window never splits a character.
+    while 0 < end < len(data) and data[end] & 0xC0 == 0x80:
+        end -= 1
+    return end
+
+class PagedTextViewer(QWidget):
+    # Shows a window of about WINDOW_BYTES of a large byte source in a QPlainTextEdit. The outer
+    # scroll bar moves the window through the whole source; the editor scrolls within it and the
+    # window is re-centred on the top line when it reaches either end. When editable, an edited
+    # window is written back into the source, replacing only its own bytes, before another
+    # window is loaded. The editor shows \r\n as \n; a window whose lines mostly end in \r\n
+    # gets \r\n back on every line when it is written, so a window mixing both is normalized.
+    def __init__(self, source, parent=None, editable=False):
+        super().__init__(parent)
+        self.source = source
+        self.start = 0
+        self.end = 0
+        self.data = b''
+        self.shown = ''
+        self.crlf = False
+        self.loading = False
+        self.dirty = False
+        self.modified = False
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setReadOnly(not editable)
+        self.text_edit.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text_edit.setUndoRedoEnabled(editable)
+        self.text_edit.verticalScrollBar().valueChanged.connect(self.inner_scrolled)
+        self.text_edit.textChanged.connect(self.text_changed)
+        self.scroll_bar = QScrollBar(Qt.Vertical)
+        self.scroll_bar.setRange(0, max(0, source.size // SCROLL_UNIT))
+        self.scroll_bar.setPageStep(max(1, WINDOW_BYTES // SCROLL_UNIT // 2))
+        self.scroll_bar.valueChanged.connect(self.outer_scrolled)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.text_edit)
+        layout.addWidget(self.scroll_bar)
+        self.load_window(0)
+
+    def load_window(self, offset):
+        # Centres the window on offset where possible and scrolls the editor to the line holding it.
+        self.commit_window()
+        cursor_offset = self.byte_offset(self.text_edit.textCursor().position())
+        size = self.source.size
+        offset = max(0, min(offset, size))
+        start = self.source.line_start(max(0, min(offset - WINDOW_BYTES // 2, size - WINDOW_BYTES)))
+        at_end = start + WINDOW_BYTES >= size or offset > size - WINDOW_BYTES // 2
+        data = self.source.read(start, size - start if at_end else WINDOW_BYTES)
+        if not at_end:
+            cut = data.rfind(b'\n')
+            data = data[:cut + 1] if cut > 0 else data[:char_boundary(data, len(data))]
+        self.start = start
+        self.end = start + len(data)
+        self.data = data
+        self.crlf = data.count(b'\r\n') * 2 > data.count(b'\n')
+        self.shown = data.decode('utf-8', 'replace').replace('\r\n', '\n')
+        self.loading = True
+        self.text_edit.setPlainText(self.shown)
+        if self.start <= cursor_offset <= self.end:
+            self.set_selection(cursor_offset, cursor_offset)
+        line = self.text_edit.document().findBlock(self.qt_position(offset)).blockNumber()
+        self.text_edit.verticalScrollBar().setValue(line)
+        self.loading = False
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setValue(offset // SCROLL_UNIT)
+        self.scroll_bar.blockSignals(False)
+
+    def text_changed(self):
+        if not self.loading:
+            self.dirty = True
+            self.modified = True
+
+    def commit_window(self):
+        if not self.dirty:
+            return
+        text = self.text_edit.toPlainText()
+        data = (text.replace('\n', '\r\n') if self.crlf else text).encode('utf-8')
+        self.source.replace(self.start, self.end, data)
+        self.end = self.start + len(data)
+        self.data = data
+        self.shown = text
+        self.dirty = False
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setRange(0, max(0, self.source.size // SCROLL_UNIT))
+        self.scroll_bar.blockSignals(False)
+
+    def byte_offset(self, position):
+        # Source offset of a cursor position in the committed window. Counted per line, since the
+        # text has \n where the bytes may have \r\n.
+        prefix = utf16_prefix(self.shown, position)
+        line_start = 0
+        for _ in range(prefix.count('\n')):
+            line_start = self.data.find(b'\n', line_start) + 1
+        column = prefix[prefix.rfind('\n') + 1:]
+        return self.start + line_start + len(column.encode('utf-8'))
+
+    def qt_position(self, offset):
+        # Cursor position of a source offset inside the window; the inverse of byte_offset.
+        offset -= self.start
+        line_start = self.data.rfind(b'\n', 0, offset) + 1
+        column = self.data[line_start:offset]
+        if column.endswith(b'\r') and self.data[offset:offset + 1] == b'\n':
+            column = column[:-1]
+        text_start = 0
+        for _ in range(self.data.count(b'\n', 0, line_start)):
+            text_start = self.shown.find('\n', text_start) + 1
+        return utf16_length(self.shown[:text_start]) + utf16_length(column.decode('utf-8', 'replace'))
+
+    def set_selection(self, start, end):
+        cursor = self.text_edit.textCursor()
+        cursor.setPosition(self.qt_position(start))
+        cursor.setPosition(self.qt_position(end), QTextCursor.KeepAnchor)
+        self.text_edit.setTextCursor(cursor)
+
+    def find(self, text, backward=False):
+        # Searches the source from the cursor, loading the window around a match only if needed.
+        needle = text.encode('utf-8')
+        if not needle:
+            return False
+        self.commit_window()
+        cursor = self.text_edit.textCursor()
+        if backward:
+            found = self.source.rfind(needle, self.byte_offset(cursor.selectionStart()))
+        else:
+            found = self.source.find(needle, self.byte_offset(cursor.selectionEnd()))
+        if found < 0:
+            return False
+        if not (self.start <= found and found + len(needle) <= self.end):
+            self.load_window(found)
+        self.loading = True
+        self.set_selection(found, found + len(needle))
+        self.text_edit.ensureCursorVisible()
+        self.loading = False
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setValue(found // SCROLL_UNIT)
+        self.scroll_bar.blockSignals(False)
+        return True
+
+    def text(self):
+        self.commit_window()
+        return self.source.read(0, self.source.size).decode('utf-8', 'replace')
+
+    def top_offset(self):
+        return self.byte_offset(self.text_edit.firstVisibleBlock().position())
+
+    def outer_scrolled(self, value):
+        self.load_window(value * SCROLL_UNIT)
+
+    def inner_scrolled(self, value):
+        if self.loading:
+            return
+        self.commit_window()
+        scroll = self.text_edit.verticalScrollBar()
+        if (value >= scroll.maximum() and self.end < self.source.size) or (value <= scroll.minimum() and self.start > 0):
+            self.load_window(self.top_offset())
+        else:
+            self.scroll_bar.blockSignals(True)
+            self.scroll_bar.setValue(self.top_offset() // SCROLL_UNIT)
+            self.scroll_bar.blockSignals(False)
+
+    def close_source(self):
+        self.source.close()
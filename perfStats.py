@@ -0,0 +1,106 @@
+import functools
+import io
+import json
+import threading
+import time
+from collections import deque
+
+SAMPLE_LIMIT = 1024
+
+class Metric:
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_LIMIT)
+
+    def percentile(self, fraction):
+        samples = sorted(self.samples)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def summary(self):
+        return {"count": self.count, "total_ms": self.total * 1000, "p50_ms": self.percentile(0.5) * 1000,
+                "p95_ms": self.percentile(0.95) * 1000, "max_ms": self.max * 1000}
+
+class Metrics:
+    # Durations per name, keeping the last SAMPLE_LIMIT of each for percentiles. Nothing is
+    # recorded unless enabled, and the timers below check that flag before doing anything else.
+    def __init__(self):
+        self.enabled = False
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.profiler = None
+
+    def record(self, name, seconds):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = Metric()
+            metric.count += 1
+            metric.total += seconds
+            metric.max = max(metric.max, seconds)
+            metric.samples.append(seconds)
+
+    def summary(self):
+        with self.lock:
+            return {name: metric.summary() for name, metric in sorted(self.metrics.items())}
+
+    def reset(self):
+        with self.lock:
+            self.metrics.clear()
+
+    def export(self, filename):
+        data = {"created": time.strftime('%Y-%m-%dT%H:%M:%S'), "metrics": self.summary()}
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def start_profile(self):
+        if self.profiler is None:
+            # Imported here so the profiler costs nothing at startup unless someone asks for it.
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop_profile(self, filename=None, limit=30):
+        # Returns the top functions by cumulative time; the raw stats go to filename if given.
+        profiler, self.profiler = self.profiler, None
+        if profiler is None:
+            return ''
+        profiler.disable()
+        if filename:
+            profiler.dump_stats(filename)
+        import pstats
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+
+metrics = Metrics()
+
+class Timer:
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+
+    def stop(self):
+        metrics.record(self.name, time.perf_counter() - self.start)
+
+def start_timer(name):
+    return Timer(name) if metrics.enabled else None
+
+def timed(name):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
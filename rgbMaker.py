@@ -1,59 +1,161 @@
-import tkinter as tk
-from tkinter import Canvas, HORIZONTAL
-
-class RGBColorPicker:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("RCP")
-
-        self.red_value = tk.DoubleVar()
-        self.green_value = tk.DoubleVar()
-        self.blue_value = tk.DoubleVar()
-
-        self.red_value.set(0)
-        self.green_value.set(0)
-        self.blue_value.set(0)
-
-        self.create_widgets()
-
-    def create_widgets(self):
-        self.color_canvas = Canvas(self.root, width=200, height=200)
-        self.color_canvas.pack()
-
-        self.red_bar = tk.Scale(self.root, label="Red", from_=0, to=255, variable=self.red_value, orient=HORIZONTAL,
-                                length=200, command=self.update_color)
-        self.red_bar.pack()
-
-        self.green_bar = tk.Scale(self.root, label="Green", from_=0, to=255, variable=self.green_value, orient=HORIZONTAL,
-                                  length=200, command=self.update_color)
-        self.green_bar.pack()
-
-        self.blue_bar = tk.Scale(self.root, label="Blue", from_=0, to=255, variable=self.blue_value, orient=HORIZONTAL,
-                                 length=200, command=self.update_color)
-        self.blue_bar.pack()
-
-        copy_button = tk.Button(self.root, text="Copy RGB", command=self.copy_rgb)
-        copy_button.pack()
-
-    def update_color(self, event=None):
-        red = int(self.red_value.get())
-        green = int(self.green_value.get())
-        blue = int(self.blue_value.get())
-
-        color_hex = f"#{red:02X}{green:02X}{blue:02X}"
-        self.color_canvas.config(bg=color_hex)
-
-    def copy_rgb(self):
-        red = int(self.red_value.get())
-        green = int(self.green_value.get())
-        blue = int(self.blue_value.get())
-
-        rgb_value = f"{red}, {green}, {blue}"
-        self.root.clipboard_clear()
-        self.root.clipboard_append(rgb_value)
-        self.root.update()
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = RGBColorPicker(root)
-    root.mainloop()
\ No newline at end of file
+import colorsys
+import tkinter as tk
+from functools import lru_cache
+from tkinter import Canvas, HORIZONTAL
+import numpy as np
+from PIL import Image, ImageTk
+
+FIELD_SIZE = 200
+STRIP_HEIGHT = 16
+STRIP_GAP = 4
+FRAME_MS = 16
+FIELD_CACHE_SIZE = 256
+
+def hsv_to_rgb(h, s, v):
+    # Vectorized colorsys.hsv_to_rgb: h, s and v are arrays in [0, 1] that broadcast together.
+    h, s, v = np.broadcast_arrays(h, s, v)
+    sector = np.floor(h * 6)
+    f = h * 6 - sector
+    sector = sector.astype(np.int64) % 6
+    p = v * (1 - s)
+    q = v * (1 - f * s)
+    t = v * (1 - (1 - f) * s)
+    r = np.choose(sector, [v, q, p, p, t, v])
+    g = np.choose(sector, [t, v, v, q, p, p])
+    b = np.choose(sector, [p, p, t, v, v, q])
+    return (np.stack([r, g, b], axis=-1) * 255 + 0.5).astype(np.uint8)
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def sv_plane(hue):
+    # Saturation left to right, value top to bottom, for one hue in whole degrees.
+    s = np.linspace(0, 1, FIELD_SIZE)[np.newaxis, :]
+    v = np.linspace(1, 0, FIELD_SIZE)[:, np.newaxis]
+    return hsv_to_rgb(hue / 360, s, v)
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def hue_strip(saturation, value):
+    h = np.linspace(0, 1, FIELD_SIZE, endpoint=False)[np.newaxis, :]
+    row = hsv_to_rgb(h, saturation / 255, value / 255)
+    return np.repeat(row, STRIP_HEIGHT, axis=0)
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def channel_strip(channel, first, second):
+    # The colour with one channel swept from 0 to 255 and the other two held at first, second.
+    strip = np.empty((STRIP_HEIGHT, FIELD_SIZE, 3), dtype=np.uint8)
+    others = [c for c in range(3) if c != channel]
+    strip[:, :, channel] = np.linspace(0, 255, FIELD_SIZE).astype(np.uint8)
+    strip[:, :, others[0]] = first
+    strip[:, :, others[1]] = second
+    return strip
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def color_field(red, green, blue):
+    h, s, v = colorsys.rgb_to_hsv(red / 255, green / 255, blue / 255)
+    gap = np.zeros((STRIP_GAP, FIELD_SIZE, 3), dtype=np.uint8)
+    parts = [sv_plane(round(h * 360) % 360), gap, hue_strip(round(s * 255), round(v * 255))]
+    rgb = (red, green, blue)
+    for channel in range(3):
+        others = [rgb[c] for c in range(3) if c != channel]
+        parts += [gap, channel_strip(channel, *others)]
+    return Image.fromarray(np.vstack(parts), 'RGB')
+
+class RGBColorPicker:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("RCP")
+
+        self.red_value = tk.DoubleVar()
+        self.green_value = tk.DoubleVar()
+        self.blue_value = tk.DoubleVar()
+
+        self.red_value.set(0)
+        self.green_value.set(0)
+        self.blue_value.set(0)
+
+        self.show_field = tk.BooleanVar()
+        self.redraw_pending = False
+        self.field_image = None
+
+        self.create_widgets()
+
+    def create_widgets(self):
+        self.color_canvas = Canvas(self.root, width=200, height=200)
+        self.color_canvas.pack()
+
+        self.red_bar = tk.Scale(self.root, label="Red", from_=0, to=255, variable=self.red_value, orient=HORIZONTAL,
+                                length=200, command=self.update_color)
+        self.red_bar.pack()
+
+        self.green_bar = tk.Scale(self.root, label="Green", from_=0, to=255, variable=self.green_value, orient=HORIZONTAL,
+                                  length=200, command=self.update_color)
+        self.green_bar.pack()
+
+        self.blue_bar = tk.Scale(self.root, label="Blue", from_=0, to=255, variable=self.blue_value, orient=HORIZONTAL,
+                                 length=200, command=self.update_color)
+        self.blue_bar.pack()
+
+        copy_button = tk.Button(self.root, text="Copy RGB", command=self.copy_rgb)
+        copy_button.pack()
+
+        field_check = tk.Checkbutton(self.root, text="Color field", variable=self.show_field, command=self.toggle_field)
+        field_check.pack()
+
+        field_height = FIELD_SIZE + 4 * (STRIP_GAP + STRIP_HEIGHT)
+        self.field_canvas = Canvas(self.root, width=FIELD_SIZE, height=field_height, highlightthickness=0)
+        self.field_canvas_item = self.field_canvas.create_image(0, 0, anchor=tk.NW)
+
+    def update_color(self, event=None):
+        # Slider drags fire far more often than the screen refreshes, so redraws are coalesced
+        # into at most one per FRAME_MS.
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.root.after(FRAME_MS, self.redraw)
+
+    def current_rgb(self):
+        return int(self.red_value.get()), int(self.green_value.get()), int(self.blue_value.get())
+
+    def redraw(self):
+        self.redraw_pending = False
+        red, green, blue = self.current_rgb()
+
+        color_hex = f"#{red:02X}{green:02X}{blue:02X}"
+        self.color_canvas.config(bg=color_hex)
+        if self.show_field.get():
+            self.draw_field(red, green, blue)
+
+    def toggle_field(self):
+        if self.show_field.get():
+            self.field_canvas.pack()
+            self.draw_field(*self.current_rgb())
+        else:
+            self.field_canvas.pack_forget()
+
+    def draw_field(self, red, green, blue):
+        # The PhotoImage has to stay referenced or Tk shows a blank canvas.
+        self.field_image = ImageTk.PhotoImage(color_field(red, green, blue), master=self.root)
+        canvas = self.field_canvas
+        canvas.itemconfig(self.field_canvas_item, image=self.field_image)
+        canvas.delete('marker')
+        h, s, v = colorsys.rgb_to_hsv(red / 255, green / 255, blue / 255)
+        x, y = s * (FIELD_SIZE - 1), (1 - v) * (FIELD_SIZE - 1)
+        canvas.create_oval(x - 4, y - 4, x + 4, y + 4, outline='white', tags='marker')
+        top = FIELD_SIZE + STRIP_GAP
+        for position in (h, red / 255, green / 255, blue / 255):
+            x = position * (FIELD_SIZE - 1)
+            canvas.create_line(x, top, x, top + STRIP_HEIGHT, fill='white', width=2, tags='marker')
+            top += STRIP_HEIGHT + STRIP_GAP
+
+    def copy_rgb(self):
+        red = int(self.red_value.get())
+        green = int(self.green_value.get())
+        blue = int(self.blue_value.get())
+
+        rgb_value = f"{red}, {green}, {blue}"
+        self.root.clipboard_clear()
+        self.root.clipboard_append(rgb_value)
+        self.root.update()
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = RGBColorPicker(root)
+    root.mainloop()
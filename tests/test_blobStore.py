@@ -0,0 +1,63 @@
+import pytest
+from blobStore import data_path
+from noteList import NoteList, Note, NotebookChanged
+
+def open_store(path):
+    note_list = NoteList()
+    note_list.load_notes(path)
+    return note_list
+
+def apply_merge(note_list, merge):
+    for index, title, content, locked in merge.updates:
+        note_list.edit_note(index, title, content)
+    for index in merge.removes:
+        note_list.remove_note(index)
+    if merge.adds:
+        note_list.add_notes(merge.adds)
+
+def contents(path):
+    note_list = open_store(path)
+    found = [(note.title, note.content) for note in note_list.notes]
+    note_list.close()
+    return found
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = str(tmp_path / "notes.store")
+    seed = NoteList()
+    seed.add_note(Note("one", "body one " * 20))
+    seed.add_note(Note("two", "body two " * 20))
+    seed.save_notes(path)
+    seed.close()
+    return path
+
+def test_save_after_another_process_saved_is_refused_then_merged(store_path):
+    mine = open_store(store_path)
+    theirs = open_store(store_path)
+    theirs.add_note(Note("theirs", "their body " * 30))
+    theirs.edit_note(1, "two", "two edited by them " * 10)
+    theirs.save_notes(store_path)
+    theirs.close()
+
+    mine.edit_note(0, "one", "one edited here " * 10)
+    with pytest.raises(NotebookChanged):
+        mine.save_notes(store_path)
+    assert mine.backend.changed_on_disk()
+    merge = mine.backend.merge(mine)
+    assert not merge.conflicts
+    apply_merge(mine, merge)
+    mine.save_notes(store_path)
+    mine.close()
+
+    assert contents(store_path) == [("one", "one edited here " * 10), ("two", "two edited by them " * 10),
+                                    ("theirs", "their body " * 30)]
+
+def test_append_after_unindexed_bytes(store_path):
+    # Bytes left by a save that never wrote its index must not shift the offsets of new blobs.
+    note_list = open_store(store_path)
+    with open(data_path(store_path, note_list.backend.generation), "ab") as f:
+        f.write(b"partial blob")
+    note_list.add_note(Note("three", "body three " * 20))
+    note_list.save_notes(store_path)
+    note_list.close()
+    assert contents(store_path)[2] == ("three", "body three " * 20)
@@ -0,0 +1,24 @@
+import os
+from codeRunner import WorkerPool
+
+def test_fresh_runs_import_from_the_script_directory(tmp_path):
+    (tmp_path / "mymod.py").write_text("VALUE = 1\n")
+    pool = WorkerPool(size=1)
+    try:
+        assert pool.run("import mymod\nprint(mymod.VALUE)", str(tmp_path)) == ("1\n", True)
+        # The worker that imported mymod is retired, so an edit shows up on the next run.
+        (tmp_path / "mymod.py").write_text("VALUE = 2\n")
+        assert pool.run("import mymod\nprint(mymod.VALUE)", str(tmp_path)) == ("2\n", True)
+        output, ok = pool.run("import mymod", str(tmp_path / "elsewhere"))
+        assert not ok and "ModuleNotFoundError" in output
+    finally:
+        pool.close()
+
+def test_fresh_runs_do_not_inherit_cwd_or_sys_path(tmp_path):
+    pool = WorkerPool(size=1, max_runs=10)
+    try:
+        cwd, _ = pool.run("import os\nprint(os.getcwd())")
+        pool.run(f"import os, sys\nos.chdir({str(tmp_path)!r})\nsys.path.append('extra')")
+        assert pool.run("import os, sys\nprint(os.getcwd(), 'extra' in sys.path, repr(sys.path[0]))") == (f"{cwd.strip()} False ''\n", True)
+    finally:
+        pool.close()
@@ -0,0 +1,33 @@
+from executePy import FileLoad, FileSave, FILE_CHUNK_CHARS
+
+def load_chunks(path):
+    load = FileLoad(str(path))
+    load.start()
+    chunks = []
+    while True:
+        chunk = load.chunks.get(timeout=5)
+        if chunk is None:
+            return load, chunks
+        chunks.append(chunk)
+
+def test_crlf_across_a_chunk_boundary_stays_one_line_break(tmp_path):
+    path = tmp_path / "split.txt"
+    original = b"x" * (FILE_CHUNK_CHARS - 1) + b"\r\n" + b"y\r\n"
+    path.write_bytes(original)
+    load, chunks = load_chunks(path)
+    assert len(chunks) > 1
+    assert not any(chunk.endswith('\r') for chunk in chunks)
+    assert ''.join(chunks) == "x" * (FILE_CHUNK_CHARS - 1) + "\r\ny\r\n"
+    assert not load.lossy
+    # The editor hands back its text with \n line breaks; saving restores the file's own.
+    save = FileSave(str(path), ''.join(chunks).replace('\r\n', '\n'), load.newline)
+    save.write()
+    assert save.error is None
+    assert path.read_bytes() == original
+
+def test_invalid_utf8_is_marked_lossy(tmp_path):
+    path = tmp_path / "latin1.txt"
+    path.write_bytes("é".encode('utf-8') * FILE_CHUNK_CHARS + b"caf\xe9\n")
+    load, chunks = load_chunks(path)
+    assert load.lossy
+    assert ''.join(chunks) == "é" * FILE_CHUNK_CHARS + "caf�\n"
@@ -0,0 +1,28 @@
+import noteHistory
+from noteHistory import HistoryStore, apply_delta, make_delta
+
+LOG = ''.join(f"12:00:{i % 60:02d} INFO worker {i % 7} ok\n" for i in range(20000))
+
+def test_delta_for_one_line_edit_in_a_long_repetitive_note():
+    edited = LOG.replace("12:00:41 INFO worker 6 ok\n", "12:00:41 ERROR worker 6 failed\n", 1)
+    delta = make_delta(edited, LOG)
+    assert len(delta) == 1
+    assert apply_delta(edited, delta) == LOG
+
+def test_middle_too_large_to_diff_is_replaced_whole(monkeypatch):
+    monkeypatch.setattr(noteHistory, "DELTA_MAX_LINE_PAIRS", 100)
+    lines = LOG.splitlines(keepends=True)
+    lines[3] = "first\n"
+    lines[-3] = "last\n"
+    edited = ''.join(lines)
+    delta = make_delta(LOG, edited)
+    assert delta == [[3, len(lines) - 2, ''.join(lines[3:-2])]]
+    assert apply_delta(LOG, delta) == edited
+
+def test_history_round_trip(tmp_path):
+    history = HistoryStore(str(tmp_path / "notes.json"))
+    versions = [LOG, LOG + "tail\n", "head\n" + LOG + "tail\n"]
+    for old, new in zip(versions, versions[1:]):
+        history.record("note", "title", old, new)
+    assert [history.text("note", versions[-1], revision.rev)[1] for revision in history.revisions("note")] == versions[-2::-1]
+    history.close()
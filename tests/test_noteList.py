@@ -0,0 +1,65 @@
+import json
+import pytest
+from noteList import CompactNoteList, Note, NoteList, NotebookInUse
+from noteSearch import SearchIndex, TrigramIndex
+
+def compact_list_with_search():
+    note_list = CompactNoteList()
+    note_list.notes = note_list.new_store([Note(f"title {i}", f"body {i} common") for i in range(5)])
+    search_index = SearchIndex.build(note_list)
+    trigram_index = TrigramIndex(note_list.notes)
+    note_list.add_listener(search_index)
+    note_list.add_listener(trigram_index)
+    return note_list, search_index, trigram_index
+
+def titles(notes):
+    return [note.title for note in notes]
+
+def test_views_of_one_note_are_equal():
+    note_list, _, _ = compact_list_with_search()
+    assert note_list.notes[2] == note_list.notes[2]
+    assert hash(note_list.notes[2]) == hash(note_list.notes[2])
+    assert note_list.notes[2] != note_list.notes[3]
+    assert note_list.notes.index(note_list.notes[3]) == 3
+
+def test_compact_store_edit_and_remove_with_search():
+    note_list, search_index, trigram_index = compact_list_with_search()
+    note_list.edit_note(1, "renamed", "body edited")
+    note_list.remove_note(0)
+    note_list.add_note(Note("added", "body added common"))
+    assert titles(search_index.search("edited")) == ["renamed"]
+    assert sorted(titles(search_index.search("common"))) == ["added", "title 2", "title 3", "title 4"]
+    assert titles(trigram_index.search("renamed", 1)) == ["renamed"]
+    # Views kept by the indexes follow their notes after the rows shift.
+    found = search_index.search("body 3")[0]
+    assert found.title == "title 3"
+    assert note_list.notes.index(found) == 2
+    note_list.remove_note(note_list.notes.index(found))
+    assert search_index.search("body 3") == []
+    assert "title 3" not in titles(note_list.notes)
+
+def test_journal_has_one_writer_and_continues_its_sequence(tmp_path):
+    path = str(tmp_path / "notes.json")
+    seed = NoteList()
+    seed.add_note(Note("one", "first"))
+    seed.save_notes(path)
+    app = NoteList()
+    app.load_notes(path)
+    app.open_journal(path)
+    cli = NoteList()
+    cli.load_notes(path)
+    with pytest.raises(NotebookInUse):
+        cli.open_journal(path)
+    app.edit_note(0, "one", "edited in the app")
+    app.close()
+    # Opened after the app closed, the journal replays the app's edit before numbering its own.
+    cli.open_journal(path)
+    assert cli.notes[0].content == "edited in the app"
+    cli.add_note(Note("two", "added by the cli"))
+    cli.close()
+    with open(path + ".journal") as f:
+        assert [json.loads(line)["seq"] for line in f] == [2, 3]
+    reloaded = NoteList()
+    reloaded.load_notes(path)
+    assert [(note.title, note.content) for note in reloaded.notes] == [("one", "edited in the app"), ("two", "added by the cli")]
+    reloaded.close()
@@ -0,0 +1,57 @@
+import json
+import os
+import pickle
+from noteList import NoteList, Note
+
+def make_notebook(path):
+    note_list = NoteList()
+    note_list.add_note(Note("alpha", "first body"))
+    note_list.add_note(Note("beta", "second body"))
+    note_list.save_notes(path)
+    note_list.close()
+
+def open_with_index(path):
+    note_list = NoteList()
+    note_list.load_notes(path)
+    return note_list, note_list.open_search_index()
+
+def titles(notes):
+    return [note.title for note in notes]
+
+def test_saved_index_is_reused_until_the_notebook_changes_on_disk(tmp_path):
+    path = str(tmp_path / "notes.json")
+    make_notebook(path)
+    note_list, search_index = open_with_index(path)
+    search_index.save(path + ".search", note_list)
+    note_list.close()
+    note_list, search_index = open_with_index(path)
+    assert titles(search_index.search("second")) == ["beta"]
+    assert search_index.doc_ids
+    note_list.close()
+
+    # Another program rewrites a note; journal_seq and the note count stay the same.
+    with open(path) as f:
+        data = json.load(f)
+    data["notes"][1]["content"] = "replaced text"
+    with open(path, "w") as f:
+        json.dump(data, f)
+    note_list, search_index = open_with_index(path)
+    assert search_index.search("second") == []
+    assert titles(search_index.search("replaced")) == ["beta"]
+    note_list.close()
+
+class Planted:
+    def __reduce__(self):
+        return (os.mkdir, (self.target,))
+
+def test_planted_pickle_is_not_loaded(tmp_path):
+    path = str(tmp_path / "notes.json")
+    make_notebook(path)
+    planted = Planted()
+    planted.target = str(tmp_path / "ran")
+    with open(path + ".search", "wb") as f:
+        pickle.dump(planted, f)
+    note_list, search_index = open_with_index(path)
+    assert not os.path.exists(planted.target)
+    assert titles(search_index.search("first")) == ["alpha"]
+    note_list.close()
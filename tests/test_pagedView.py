@@ -0,0 +1,53 @@
+import os
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+from pagedView import BytesSource, PagedTextViewer, WINDOW_BYTES
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+def make_viewer(text):
+    return PagedTextViewer(BytesSource(text.encode('utf-8')), editable=True)
+
+def type_text(viewer, text):
+    viewer.text_edit.textCursor().insertText(text)
+
+def test_find_selects_match_after_crlf():
+    viewer = make_viewer('line1\r\nline2\r\ntarget here\r\n')
+    assert viewer.find('target')
+    assert viewer.text_edit.textCursor().selectedText() == 'target'
+    type_text(viewer, 'X')
+    assert viewer.text() == 'line1\r\nline2\r\nX here\r\n'
+
+def test_find_selects_match_after_non_bmp():
+    viewer = make_viewer('\U0001F600 emoji \U0001F600\ntarget\n')
+    assert viewer.find('target')
+    assert viewer.text_edit.textCursor().selectedText() == 'target'
+    assert viewer.find('emoji', backward=True)
+    assert viewer.text_edit.textCursor().selectedText() == 'emoji'
+    type_text(viewer, 'X')
+    assert viewer.text() == '\U0001F600 X \U0001F600\ntarget\n'
+
+def test_edit_keeps_crlf_line_endings():
+    viewer = make_viewer('a\r\nb\r\nc\r\n')
+    type_text(viewer, 'new\n')
+    assert viewer.text() == 'new\r\na\r\nb\r\nc\r\n'
+
+def test_edits_survive_window_moves():
+    lines = [f'\U0001F600 line {i}\r\n' for i in range(4 * WINDOW_BYTES // 16)]
+    viewer = make_viewer(''.join(lines))
+    type_text(viewer, 'first ')
+    assert viewer.find('line 20000\r')
+    type_text(viewer, 'moved')
+    assert viewer.find('line 5\r', backward=True)
+    lines[0] = 'first ' + lines[0]
+    lines[20000] = lines[20000].replace('line 20000', 'moved')
+    assert viewer.text() == ''.join(lines)
+
+def test_unedited_viewer_is_not_modified():
+    viewer = make_viewer('x\r\ny\r\n')
+    viewer.find('y')
+    assert not viewer.modified
+    assert viewer.text() == 'x\r\ny\r\n'
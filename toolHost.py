@@ -0,0 +1,90 @@
+import sys
+import time
+import importlib
+from PyQt5.QtCore import QTimer
+from perfStats import metrics
+
+TK_POLL_MS = 20
+
+class ToolHost:
+    # Opens the helper tools as windows in this process, importing each module the first time
+    # it is needed. Tk tools share one hidden Tk root that is pumped from a Qt timer.
+    def __init__(self, on_timing=None):
+        self.windows = {}
+        self.timings = []
+        self.on_timing = on_timing
+        self.tk_root = None
+        self.tk_timer = None
+
+    def load(self, module_name):
+        start = time.perf_counter()
+        cached = module_name in sys.modules
+        module = importlib.import_module(module_name)
+        return module, 0.0 if cached else time.perf_counter() - start
+
+    def open_window(self, name, module_name, factory):
+        window = self.windows.get(name)
+        if window is not None and window.isVisible():
+            window.raise_()
+            window.activateWindow()
+            return window
+        start = time.perf_counter()
+        module, import_time = self.load(module_name)
+        imported = time.perf_counter()
+        window = factory(module)
+        window.show()
+        shown = time.perf_counter()
+        self.windows[name] = window
+        # The first turn of the event loop after show() is when the window actually paints.
+        QTimer.singleShot(0, lambda: self.record(name, import_time, shown - imported, time.perf_counter() - start))
+        return window
+
+    def open_editor(self):
+        return self.open_window('Developer Mode', 'executePy', lambda module: module.TextEditor(tool_host=self))
+
+    def open_rgb_maker(self):
+        start = time.perf_counter()
+        module, import_time = self.load('rgbMaker')
+        if self.tk_root is None:
+            import tkinter
+            self.tk_root = tkinter.Tk()
+            self.tk_root.withdraw()
+            self.tk_timer = QTimer()
+            self.tk_timer.setInterval(TK_POLL_MS)
+            self.tk_timer.timeout.connect(self.pump_tk)
+        created = time.perf_counter()
+        module.RGBColorPicker(module.tk.Toplevel(self.tk_root))
+        self.tk_root.update()
+        self.tk_timer.start()
+        end = time.perf_counter()
+        self.record('RGB Maker', import_time, end - created, end - start)
+
+    def pump_tk(self):
+        self.tk_root.update()
+        if not self.tk_root.winfo_children():
+            self.tk_timer.stop()
+
+    def open_calculator(self):
+        start = time.perf_counter()
+        module, import_time = self.load('calculator')
+        module.open_calculator()
+        end = time.perf_counter()
+        self.record('Calculator', import_time, end - start - import_time, end - start)
+
+    def record(self, name, import_time, create_time, total_time):
+        timing = {'tool': name, 'import_ms': import_time * 1000, 'create_ms': create_time * 1000,
+                  'total_ms': total_time * 1000}
+        self.timings.append(timing)
+        if metrics.enabled:
+            metrics.record(f"open_tool.{name}", total_time)
+        if self.on_timing is not None:
+            self.on_timing(timing)
+
+    def close(self):
+        for window in self.windows.values():
+            window.close()
+        self.windows.clear()
+        if self.tk_root is not None:
+            self.tk_timer.stop()
+            self.tk_root.destroy()
+            self.tk_root = None